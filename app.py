@@ -2,25 +2,48 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, date
 import numpy as np
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 import io
+import os
+import tempfile
+import zipfile
+import json
+import threading
 import smtplib
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import re
+import html
 import streamlit.components.v1 as components
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict, defaultdict
+from bisect import bisect_left
+import google_auth_httplib2
+import httplib2
 from functools import lru_cache
 import time
 import pytz
 from difflib import get_close_matches
+from jinja2 import Environment
 import hashlib
+import openpyxl
+import xlsxwriter
+from pandas.io.parsers import TextParser
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # Optional fast reader; falls back to streaming openpyxl
+    CalamineWorkbook = None
 
 # Configure page settings
 st.set_page_config(
@@ -362,7 +385,7 @@ st.markdown("""
 if 'sidebar_hidden' not in st.session_state:
     st.session_state.sidebar_hidden = False
 
-if not st.session_state.sidebar_hidden:
+if not st.session_state.get('sidebar_hidden', False):
     with st.sidebar:
         st.markdown(
             """
@@ -402,58 +425,363 @@ FILE_IDS = {
     'task_status': st.secrets["google_drive"]["task_status"]
 }
 
-@st.cache_resource(ttl=3600)  # Cache authentication for 1 hour
-def authenticate_drive():
+# Local copies of downloaded Drive files, keyed by file ID and revision
+DRIVE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "drive")
+
+def get_drive_revision(service, file_id):
+    """Return a revision tag for a Drive file using a metadata-only request."""
+    metadata = service.files().get(fileId=file_id, fields="md5Checksum,modifiedTime").execute()
+    return metadata.get("md5Checksum") or metadata.get("modifiedTime")
+
+def read_drive_cache(file_id, revision):
+    """Return the cached bytes of a Drive file if they match the given revision."""
+    try:
+        with open(os.path.join(DRIVE_CACHE_DIR, f"{file_id}.json")) as meta_file:
+            if json.load(meta_file).get("revision") != revision:
+                return None
+        with open(os.path.join(DRIVE_CACHE_DIR, f"{file_id}.bin"), "rb") as data_file:
+            return data_file.read()
+    except (OSError, ValueError):
+        return None
+
+def write_drive_cache(file_id, revision, content):
+    """Store the bytes of a Drive file revision in the local cache."""
+    try:
+        os.makedirs(DRIVE_CACHE_DIR, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        for name, payload in [
+            (f"{file_id}.bin", content),
+            (f"{file_id}.json", json.dumps({"revision": revision, "cached_at": time.time()}).encode()),
+        ]:
+            path = os.path.join(DRIVE_CACHE_DIR, name)
+            with open(path + suffix, "wb") as f:
+                f.write(payload)
+            os.replace(path + suffix, path)
+    except OSError:
+        # The cache only saves downloads; a read-only disk should not stop loading
+        pass
+
+# Download settings shared by every Drive loader
+DRIVE_DOWNLOAD_CONFIG = {
+    "chunk_size": 8 * 1024 * 1024,  # bytes per download request
+    "timeout": 60,  # seconds before a single HTTP request is abandoned
+    "max_retries": 4,
+    "backoff_base": 1.0  # seconds, doubled after every failed attempt
+}
+
+def is_retryable_drive_error(error):
+    """Return True for Drive errors that are worth retrying (rate limits, server and network errors)."""
+    if isinstance(error, HttpError):
+        return error.resp.status in (429, 500, 502, 503, 504)
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+class DriveRevisionChanged(Exception):
+    """The file changed on Drive between reading its revision and downloading it."""
+
+def content_matches_revision(content, revision):
+    """Whether downloaded bytes belong to a revision; only md5Checksum revisions can be verified."""
+    if not re.fullmatch(r"[0-9a-f]{32}", str(revision)):
+        return True
+    return hashlib.md5(content).hexdigest() == revision
+
+class DriveDownloadEngine:
+    """Single entry point for Drive downloads with retries, timeouts, counters and request sharing."""
+
+    def __init__(self, credentials, config):
+        self.credentials = credentials
+        self.config = config
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {
+            "downloads": 0,
+            "cache_hits": 0,
+            "shared_requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "bytes": 0,
+            "seconds": 0.0
+        }
+
+    def _service(self):
+        # httplib2 connections are not thread-safe, so every thread gets its own client
+        service = getattr(self._local, "service", None)
+        if service is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials,
+                http=httplib2.Http(timeout=self.config["timeout"])
+            )
+            service = build('drive', 'v3', http=http, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def get_revision(self, file_id):
+        """Return the current revision tag of a Drive file."""
+        return get_drive_revision(self._service(), file_id)
+
+    def fetch(self, file_id, revision=None):
+        """Return the bytes of a Drive file, sharing the download with concurrent callers."""
+        if revision is None:
+            revision = self.get_revision(file_id)
+
+        key = (file_id, revision)
+        with self._lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["shared_requests"] += 1
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            content = read_drive_cache(file_id, revision)
+            if content is None:
+                content = self._download(file_id)
+                # Drive always serves the current content, which may be newer than the revision asked for
+                if not content_matches_revision(content, revision):
+                    raise DriveRevisionChanged(f"Drive file {file_id} changed while it was being downloaded")
+                write_drive_cache(file_id, revision, content)
+            else:
+                self._count(cache_hits=1)
+            future.set_result(content)
+            return content
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _download(self, file_id):
+        for attempt in range(self.config["max_retries"] + 1):
+            started = time.perf_counter()
+            try:
+                request = self._service().files().get_media(fileId=file_id)
+                file_buffer = io.BytesIO()
+                downloader = MediaIoBaseDownload(file_buffer, request, chunksize=self.config["chunk_size"])
+                done = False
+                while not done:
+                    status, done = downloader.next_chunk()
+
+                content = file_buffer.getvalue()
+                self._count(downloads=1, bytes=len(content), seconds=time.perf_counter() - started)
+                return content
+            except Exception as e:
+                if attempt == self.config["max_retries"] or not is_retryable_drive_error(e):
+                    self._count(failures=1)
+                    raise
+                self._count(retries=1)
+                time.sleep(self.config["backoff_base"] * 2 ** attempt)
+
+@st.cache_resource
+def get_drive_engine():
+    """Create the process-wide Drive download engine."""
     try:
         credentials = service_account.Credentials.from_service_account_info(
             st.secrets["google_drive_credentials"],
             scopes=['https://www.googleapis.com/auth/drive.readonly']
         )
-        service = build('drive', 'v3', credentials=credentials)
-        return service
+        return DriveDownloadEngine(credentials, DRIVE_DOWNLOAD_CONFIG)
     except Exception as e:
         st.error(f"Failed to authenticate with Google Drive: {str(e)}")
         return None
 
-@st.cache_data(ttl=300)
-def load_data_from_drive(file_id, skip_validation=False):
-    """Load data from Google Drive."""
+# Excel reader backend used for each FILE_IDS entry: "calamine", "openpyxl_stream" or "openpyxl"
+EXCEL_READERS = {
+    'collections_data': "calamine",
+    'itss_tender': "calamine",
+    'sdr_trend': "calamine",
+    'tsg_trend': "calamine",
+    'task_status': "calamine"
+}
+
+EXCEL_ERROR_VALUES = {"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"}
+
+def convert_excel_value(value):
+    """Normalise a raw cell value the way pandas' openpyxl reader does."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value in EXCEL_ERROR_VALUES:
+        return np.nan
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+def read_rows_calamine(content):
+    """
+    Read the first worksheet with python-calamine (Rust, no per-cell Python objects until the end).
+
+    Unlike pd.read_excel, whitespace-only text saved without xml:space="preserve" (as
+    openpyxl writes it; Excel preserves it) comes back as an empty cell.
+    """
+    workbook = CalamineWorkbook.from_filelike(io.BytesIO(content))
     try:
-        service = authenticate_drive()
-        if not service:
-            return None
+        return workbook.get_sheet_by_index(0).to_python(skip_empty_area=False)
+    finally:
+        workbook.close()
 
-        # Download the file from Google Drive
-        request = service.files().get_media(fileId=file_id)
-        file_buffer = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_buffer, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-
-        # Read the data as a DataFrame
-        file_buffer.seek(0)
-        df = pd.read_excel(file_buffer, header=0)
-
-        # If validation is not skipped, enforce `Account Name` or `Branch Name` checks
-        if not skip_validation:
-            if df.columns[0] not in ["Branch Name", "Account Name"]:
-                st.write("Initial columns identified: ", df.columns.tolist())
-                df.columns = df.iloc[0]  # Assign the first row as the header
-                df = df.drop(0).reset_index(drop=True)
-
-            df.columns = [str(col).strip() for col in df.columns]
-
-            if 'Account Name' not in df.columns and 'Branch Name' not in df.columns:
-                st.error("Failed to find the 'Account Name' or 'Branch Name' column. Please check the uploaded data format.")
-                return None
+def read_rows_openpyxl_stream(content):
+    """Read the first worksheet with openpyxl in read-only, values-only streaming mode."""
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True, keep_links=False)
+    try:
+        return list(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
 
-        return df
+EXCEL_ROW_READERS = {
+    "calamine": read_rows_calamine,
+    "openpyxl_stream": read_rows_openpyxl_stream
+}
 
+def rows_to_frame(rows, header=0):
+    """Build a DataFrame from raw worksheet rows with the same parsing rules as pd.read_excel."""
+    data = []
+    for row in rows:
+        values = [convert_excel_value(value) for value in row]
+        # Trailing empty cells and rows are dropped, as pandas' Excel readers do
+        while values and values[-1] == "":
+            values.pop()
+        data.append(values)
+    while data and not data[-1]:
+        data.pop()
+    if not data:
+        return pd.DataFrame()
+
+    width = max(len(values) for values in data)
+    data = [values + [""] * (width - len(values)) for values in data]
+    return TextParser(data, header=header).read()
+
+def read_workbook(content, reader="openpyxl", header=0):
+    """Parse the first sheet of an xlsx workbook with the given reader backend."""
+    if reader == "calamine" and CalamineWorkbook is None:
+        reader = "openpyxl_stream"
+    if reader not in EXCEL_ROW_READERS:
+        return pd.read_excel(io.BytesIO(content), header=header, engine="openpyxl")
+    return rows_to_frame(EXCEL_ROW_READERS[reader](content), header)
+
+def load_data_from_drive(dataset, revision, skip_validation=False):
+    """Load exactly the given Drive revision of a FILE_IDS entry with its configured Excel reader."""
+    if revision is None:
+        st.error("Error loading data: the Drive revision of the file could not be determined.")
+        return None
+    try:
+        return load_drive_file_revision(FILE_IDS[dataset], revision, skip_validation, EXCEL_READERS[dataset])
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
+@st.cache_data(max_entries=20)
+def load_drive_file_revision(file_id, revision, skip_validation=False, reader="openpyxl"):
+    """
+    Parse a specific revision of a Drive file, downloading it only if not cached locally.
+
+    Download and parse errors are raised rather than returned as None: st.cache_data
+    does not cache exceptions, so a transient failure is retried on the next call.
+    """
+    engine = get_drive_engine()
+    if not engine:
+        raise RuntimeError("Google Drive is not available")
+    content = engine.fetch(file_id, revision)
+
+    # Read the data as a DataFrame
+    df = read_workbook(content, reader, header=0)
+
+    # If validation is not skipped, enforce `Account Name` or `Branch Name` checks
+    if not skip_validation:
+        if df.columns[0] not in ["Branch Name", "Account Name"]:
+            st.write("Initial columns identified: ", df.columns.tolist())
+            df.columns = df.iloc[0]  # Assign the first row as the header
+            df = df.drop(0).reset_index(drop=True)
+
+        df.columns = [str(col).strip() for col in df.columns]
+
+        if 'Account Name' not in df.columns and 'Branch Name' not in df.columns:
+            st.error("Failed to find the 'Account Name' or 'Branch Name' column. Please check the uploaded data format.")
+            return None
+
+    return df
+
+# Parquet snapshots of cleaned datasets; bump the version whenever a loader's cleaning changes
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "snapshots")
+SNAPSHOT_SCHEMA_VERSION = 1
+
+def get_dataset_revision(dataset):
+    """Return the Drive revision of a FILE_IDS entry, or None if it cannot be determined."""
+    try:
+        engine = get_drive_engine()
+        if not engine:
+            return None
+        return engine.get_revision(FILE_IDS[dataset])
+    except Exception:
+        return None
+
+def read_snapshot(dataset, revision):
+    """Return the snapshot of a cleaned dataset if it was built from the given revision."""
+    try:
+        df = pd.read_parquet(os.path.join(SNAPSHOT_DIR, f"{dataset}.parquet"))
+        meta = df.attrs.get("snapshot", {})
+        if meta.get("schema_version") != SNAPSHOT_SCHEMA_VERSION or meta.get("revision") != revision:
+            return None
+        df.attrs = {}
+        return df
+    except Exception:
+        return None
+
+def write_snapshot(dataset, revision, df):
+    """
+    Store a cleaned dataset as Parquet with its schema version and source revision.
+
+    The revision is written into the file's own metadata (pandas keeps DataFrame.attrs
+    in the Parquet schema), and the file is replaced in one step, so a crash or a
+    concurrent writer can never pair one revision with another revision's data.
+    """
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        data_path = os.path.join(SNAPSHOT_DIR, f"{dataset}.parquet")
+        tmp_path = f"{data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        snapshot = df.copy(deep=False)
+        snapshot.attrs = {"snapshot": {
+            "schema_version": SNAPSHOT_SCHEMA_VERSION,
+            "revision": revision,
+            "saved_at": time.time()
+        }}
+        snapshot.to_parquet(tmp_path)
+        os.replace(tmp_path, data_path)
+    except Exception:
+        # Frames Parquet cannot represent (e.g. mixed-type columns) are simply not snapshotted
+        pass
+
+def load_with_snapshot(dataset, build_dataset, revision=None):
+    """
+    Return a cleaned dataset from its snapshot when current, otherwise build and snapshot it.
+
+    build_dataset(revision) must load exactly that revision, so a snapshot never pairs
+    a revision with the frame of another one.
+    """
+    if revision is None:
+        revision = get_dataset_revision(dataset)
+    if revision is not None:
+        df = read_snapshot(dataset, revision)
+        if df is not None:
+            return df
+
+    df = build_dataset(revision)
+    if df is not None and revision is not None:
+        write_snapshot(dataset, revision, df)
+    return df
+
 def deduplicate_columns(columns):
     """Function to deduplicate column names."""
     new_columns = []
@@ -470,10 +798,98 @@ def deduplicate_columns(columns):
     return new_columns
 
 # Enhanced authentication
+# Failed logins allowed per username within the window before further attempts are refused
+LOGIN_RATE_LIMIT = {
+    "max_attempts": 3,  # per client and username
+    "max_client_attempts": 20,  # per client, across all usernames
+    "window_seconds": 300,
+    "max_tracked_keys": 10_000  # oldest entries are dropped beyond this
+}
+
+class LoginRateLimiter:
+    """
+    Sliding-window count of failed logins, shared by every session.
+
+    Failures are counted per (client, username), so a client can only lock a username
+    out for itself, and per client across usernames, which also limits guessing
+    unknown usernames without keeping a counter for each of them.
+    """
+
+    def __init__(self, max_attempts, max_client_attempts, window_seconds, max_tracked_keys):
+        self.max_attempts = max_attempts
+        self.max_client_attempts = max_client_attempts
+        self.window_seconds = window_seconds
+        self.max_tracked_keys = max_tracked_keys
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent_failures(self, key, now):
+        failures = [t for t in self._failures.get(key, []) if now - t < self.window_seconds]
+        if failures:
+            self._failures[key] = failures
+        else:
+            self._failures.pop(key, None)
+        return failures
+
+    def _limits(self, client, username):
+        return [((client, username), self.max_attempts), ((client, None), self.max_client_attempts)]
+
+    def retry_after(self, client, username):
+        """Seconds until the client may try to log in as username again, or 0 if it is not blocked."""
+        with self._lock:
+            now = time.time()
+            wait = 0
+            for key, limit in self._limits(client, username):
+                failures = self._recent_failures(key, now)
+                if len(failures) >= limit:
+                    # Unblocked once the oldest failure that keeps the count at the limit leaves the window
+                    wait = max(wait, self.window_seconds - (now - failures[-limit]))
+            return wait
+
+    def record_failure(self, client, username, known_user=True):
+        """Count a failed login; usernames that do not exist only count against the client."""
+        with self._lock:
+            now = time.time()
+            keys = [key for key, _ in self._limits(client, username) if known_user or key[1] is None]
+            for key in keys:
+                self._failures[key] = self._recent_failures(key, now) + [now]
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.max_tracked_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, client, username):
+        with self._lock:
+            for key, _ in self._limits(client, username):
+                self._failures.pop(key, None)
+
+@st.cache_resource
+def get_login_rate_limiter():
+    """Create the process-wide login rate limiter."""
+    return LoginRateLimiter(**LOGIN_RATE_LIMIT)
+
+def get_login_client_id():
+    """
+    Best-effort identity of the browser connection for login rate limiting.
+
+    This is the socket address, unless trusted_proxy is set in the [login] secrets: then
+    the app runs behind a reverse proxy that appends the address it saw to
+    X-Forwarded-For, and the last entry is used. Without such a proxy clients can send
+    any X-Forwarded-For they like, so it is ignored. Falls back to the session id when
+    the connection is not available.
+    """
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx else "unknown"
+    try:
+        request = runtime.get_instance().get_client(session_id).request
+        forwarded = request.headers.get("X-Forwarded-For") if st.secrets.get("login", {}).get("trusted_proxy") else None
+        address = forwarded.split(",")[-1].strip() if forwarded else request.remote_ip
+    except Exception:
+        address = None
+    return address if isinstance(address, str) and address else session_id
+
 def check_password():
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
-        st.session_state.login_attempts = 0
 
     if not st.session_state.authenticated:
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -504,28 +920,39 @@ def check_password():
             password = st.text_input("Password", type="password")
 
             if st.button("Login"):
-                if st.session_state.login_attempts >= 3:
-                    st.error("Too many failed attempts. Please try again later.")
-                    time.sleep(5)
+                limiter = get_login_rate_limiter()
+                client = get_login_client_id()
+                retry_after = limiter.retry_after(client, username)
+                if retry_after > 0:
+                    st.error(f"Too many failed attempts. Please try again in {int(retry_after) + 1} seconds.")
                     return False
 
                 if username in CREDENTIALS and CREDENTIALS[username] == hash_password(password):
+                    limiter.reset(client, username)
                     st.session_state.authenticated = True
                     st.session_state.username = username
+                    prefetch_datasets()
                     st.rerun()
                 else:
-                    st.session_state.login_attempts += 1
+                    limiter.record_failure(client, username, known_user=username in CREDENTIALS)
                     st.error("Invalid credentials")
         return False
     return True
         
-# Specific functions to load each dataset
-@st.cache_data(ttl=300)
-def load_itss_data():
+# Specific functions to load each dataset (served through the DatasetStore below)
+def load_collections_data(revision=None):
+    """Load Branch Reco collections data, using the local snapshot when it is current."""
+    return load_with_snapshot('collections_data', lambda revision: load_data_from_drive('collections_data', revision), revision)
+
+def load_itss_data(revision=None):
+    """Load ITSS Tender data, using the local snapshot when it is current."""
+    return load_with_snapshot('itss_tender', build_itss_data, revision)
+
+def build_itss_data(revision):
     """Load ITSS Tender data from Google Drive with fixed column separation."""
     try:
         # Load data from Google Drive using the appropriate file_id
-        df = load_data_from_drive(FILE_IDS['itss_tender'])
+        df = load_data_from_drive('itss_tender', revision)
 
         if df is None:
             return None
@@ -611,33 +1038,28 @@ def verify_excel_structure(file_path):
         st.error(f"Error verifying Excel structure: {str(e)}")
         return None
 
-@st.cache_data(ttl=300)
-def load_sdr_trend():
+def load_sdr_trend(revision=None):
+    """Load CSD SDR Trend data, using the local snapshot when it is current."""
+    return load_with_snapshot('sdr_trend', build_sdr_trend, revision)
+
+def build_sdr_trend(revision):
     """Load CSD SDR Trend data from Google Drive"""
     try:
         # Load data from Google Drive using the appropriate file_id
-        service = authenticate_drive()
-        if not service:
+        engine = get_drive_engine()
+        if not engine:
             return None
 
-        request = service.files().get_media(fileId=FILE_IDS['sdr_trend'])
-        file_buffer = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_buffer, request)
-
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-
-        file_buffer.seek(0)
+        content = engine.fetch(FILE_IDS['sdr_trend'], revision)
 
         # Read Excel and automatically assign headers
-        df = pd.read_excel(file_buffer, engine='openpyxl', header=0)
+        df = read_workbook(content, EXCEL_READERS['sdr_trend'], header=0)
 
         # Deduplicate column names manually if duplicates are found
         df.columns = deduplicate_columns(df.columns)
 
         # Identify the date columns and convert their format explicitly
-        static_columns = ['Ageing Category', 'Reduced OS']
+        static_columns = TREND_STATIC_COLUMNS['sdr_trend']
         date_columns = [col for col in df.columns if col not in static_columns]
 
         for col in date_columns:
@@ -676,28 +1098,23 @@ def deduplicate_columns(columns):
 
     return new_columns
 
-@st.cache_data(ttl=300)
-def load_tsg_trend():
+def load_tsg_trend(revision=None):
+    """Load TSG Payment Receivables Trend data, using the local snapshot when it is current."""
+    return load_with_snapshot('tsg_trend', build_tsg_trend, revision)
+
+def build_tsg_trend(revision):
     """Load TSG Payment Receivables Trend data from Google Drive"""
     try:
         # Load data from Google Drive using the appropriate file_id
-        service = authenticate_drive()
-        if not service:
+        engine = get_drive_engine()
+        if not engine:
             return None
 
         # Requesting the file from Google Drive
-        request = service.files().get_media(fileId=FILE_IDS['tsg_trend'])
-        file_buffer = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_buffer, request)
-
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-
-        file_buffer.seek(0)
+        content = engine.fetch(FILE_IDS['tsg_trend'], revision)
 
         # Attempt to read Excel file without assigning headers initially
-        df = pd.read_excel(file_buffer, header=None)
+        df = read_workbook(content, EXCEL_READERS['tsg_trend'], header=None)
 
         # Manually check and assign headers
         initial_headers = df.iloc[0]  # Assume first row might be the actual headers
@@ -800,6 +1217,60 @@ def calculate_branch_metrics(df, selected_date):
         st.error(f"Error calculating metrics: {str(e)}")
         return None
 
+def longest_true_run(mask):
+    """Length of the longest run of consecutive True values in each row of a 2-D boolean array."""
+    rows, cols = mask.shape
+    result = np.zeros(rows, dtype=int)
+    if cols == 0:
+        return result
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    start_rows, start_cols = np.nonzero(edges == 1)
+    _, end_cols = np.nonzero(edges == -1)
+    np.maximum.at(result, start_rows, end_cols - start_cols)
+    return result
+
+def compute_trend_statistics(df, entity_col, date_col, value_col, entities=None):
+    """
+    Compute change statistics for every entity from one entity x date pivot.
+
+    Consecutive dates are compared across all dates in `df`; a pair where either
+    value is missing counts as no change. Returns one row per entity with:
+    - increase_count / decrease_count: date pairs where the value rose / fell
+    - longest_increase_streak / longest_decrease_streak: longest run of rises / falls
+    - current_streak: length of the latest run of same-direction changes (negative when falling)
+    - latest_delta / total_delta: change over the last date pair / from first to last value
+    """
+    data = df.dropna(subset=[date_col]).drop_duplicates([entity_col, date_col])
+    pivot = data.pivot(index=entity_col, columns=date_col, values=value_col).sort_index(axis=1)
+    if entities is not None:
+        pivot = pivot.reindex(entities)
+
+    values = pivot.to_numpy(dtype=float)
+    deltas = np.diff(values, axis=1)
+    signs = np.nan_to_num(np.sign(deltas))
+
+    if signs.shape[1]:
+        last_sign = signs[:, -1:]
+        same_as_last = (signs == last_sign) & (last_sign != 0)
+        current_streak = np.cumprod(same_as_last[:, ::-1], axis=1).sum(axis=1) * last_sign[:, 0]
+        latest_delta = deltas[:, -1]
+    else:
+        current_streak = np.zeros(len(pivot))
+        latest_delta = np.full(len(pivot), np.nan)
+
+    return pd.DataFrame({
+        'increase_count': (signs > 0).sum(axis=1),
+        'decrease_count': (signs < 0).sum(axis=1),
+        'longest_increase_streak': longest_true_run(signs > 0),
+        'longest_decrease_streak': longest_true_run(signs < 0),
+        'current_streak': current_streak.astype(int),
+        'latest_delta': latest_delta,
+        'total_delta': (pivot.ffill(axis=1).iloc[:, -1] - pivot.bfill(axis=1).iloc[:, 0]).to_numpy()
+        if pivot.shape[1] else np.nan
+    }, index=pivot.index)
+
 def calculate_metrics(df):
     """Calculate key performance metrics with error handling"""
     try:
@@ -829,7 +1300,7 @@ def calculate_metrics(df):
         # Top Branch
         branch_col = [col for col in df.columns if any(x in col.lower() for x in ['branch', 'branch name'])]
         if branch_col and collection_col:
-            metrics['top_branch'] = df.groupby(branch_col[0])[collection_col[0]].sum().idxmax()
+            metrics['top_branch'] = df.groupby(branch_col[0], observed=True)[collection_col[0]].sum().idxmax()
         else:
             metrics['top_branch'] = "N/A"
             
@@ -843,43 +1314,121 @@ def calculate_metrics(df):
             'top_branch': "N/A"
         }
 
+def build_comparison_frame(df, branches, dates, metrics=None, fill_value=0):
+    """
+    Build a branch-by-date comparison table from long-format data with one indexed reindex.
+
+    `metrics` maps source columns to labels; output columns are "<label> (<date>)",
+    grouped by date in the order the dates are given. Branches without a row for a
+    date get `fill_value`.
+    """
+    metrics = metrics or {'Balance As On': 'Balance', 'Pending Amount': 'Pending'}
+    indexed = df.drop_duplicates(['Branch Name', 'Date']).set_index(['Branch Name', 'Date'])[list(metrics)]
+    wanted = pd.MultiIndex.from_product([branches, dates], names=['Branch Name', 'Date'])
+    values = indexed.reindex(wanted, fill_value=fill_value).to_numpy().reshape(len(branches), len(dates), len(metrics))
+
+    comparison_df = pd.DataFrame({'Branch Name': branches})
+    for date_idx, date in enumerate(dates):
+        for metric_idx, label in enumerate(metrics.values()):
+            comparison_df[f"{label} ({pd.Timestamp(date).date()})"] = values[:, date_idx, metric_idx]
+    return comparison_df
+
+# Cell colours shared by all trend tables
+IMPROVED_STYLE = 'background-color: #92D050'  # Green
+WORSENED_STYLE = 'background-color: #FF7575'  # Red
+UNCHANGED_STYLE = 'background-color: #FFFF00'  # Yellow
+
+def numeric_values(df, columns):
+    """Return the given columns as a float array, with non-numeric cells as NaN."""
+    return df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+def change_styles(values, reference, lower_is_better=True, unchanged_style=''):
+    """
+    CSS for every cell of `values` compared with the matching cell of `reference`.
+
+    Green when the change is an improvement, red when it is a deterioration,
+    `unchanged_style` when equal and blank when either value is missing.
+    """
+    values = np.asarray(values, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    valid = ~(np.isnan(values) | np.isnan(reference))
+    lower = valid & (values < reference)
+    higher = valid & (values > reference)
+    return np.select(
+        [lower, higher, valid],
+        [IMPROVED_STYLE, WORSENED_STYLE, unchanged_style] if lower_is_better else [WORSENED_STYLE, IMPROVED_STYLE, unchanged_style],
+        default=''
+    )
+
+def column_pair_styles(df, column_pairs, lower_is_better=True, unchanged_style=''):
+    """
+    Style matrix for `df` where each (styled, compared) column pair is coloured in one pass.
+
+    The result has the same shape as `df`, ready for `df.style.apply(..., axis=None)`.
+    """
+    styles = pd.DataFrame('', index=df.index, columns=df.columns)
+    if column_pairs:
+        styled_cols = [styled for styled, _ in column_pairs]
+        compared_cols = [compared for _, compared in column_pairs]
+        styles[styled_cols] = change_styles(
+            numeric_values(df, styled_cols),
+            numeric_values(df, compared_cols),
+            lower_is_better,
+            unchanged_style
+        )
+    return styles
+
+# Page sizes offered by paginated tables; smaller tables are shown whole
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+def show_paginated_table(df, style_page=None, key="table", page_size=50, height=400):
+    """
+    Show a table one page at a time, styling only the rows on the visible page.
+
+    style_page(page_df) returns a Styler for the page. The highlight functions compare
+    cells within a row, so a styled page looks the same as that slice of the fully
+    styled table.
+    """
+    page_df = df
+    if len(df) > TABLE_PAGE_SIZES[0]:
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, index=TABLE_PAGE_SIZES.index(page_size), key=f"{key}_page_size")
+
+        # The page lives only in session state (no widget default), so it can be kept
+        # in range when the page size or the data shrinks
+        n_pages = -(-len(df) // page_size)
+        page_key = f"{key}_page"
+        if page_key not in st.session_state:
+            st.session_state[page_key] = 1
+        elif st.session_state[page_key] > n_pages:
+            st.session_state[page_key] = n_pages
+        with col2:
+            page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+        start = (page - 1) * page_size
+        page_df = df.iloc[start:start + page_size]
+        with col3:
+            st.caption(f"Rows {start + 1:,}–{start + len(page_df):,} of {len(df):,} ({n_pages:,} pages)")
+
+    st.dataframe(style_page(page_df) if style_page else page_df, height=height, use_container_width=True)
+
 def style_comparison_df(df, dates):
     """
     Style the comparison DataFrame with corrected color coding:
     - Green when pending amount decreases (improvement)
     - Red when pending amount increases (deterioration)
     """
-    def highlight_pending_changes(row):
-        styles = [''] * len(df.columns)
-        
-        for i, date in enumerate(dates):
-            if i < len(dates) - 1:  # Skip the last date as it has no next date to compare
-                current_pending_col = f'Pending_{date}'
-                next_pending_col = f'Pending_{dates[i+1]}'
-                
-                if current_pending_col in df.columns and next_pending_col in df.columns:
-                    current_pending = row[current_pending_col]
-                    next_pending = row[next_pending_col]
-                    
-                    # Get column index for current pending column
-                    col_idx = df.columns.get_loc(current_pending_col)
-                    
-                    try:
-                        current_pending = float(current_pending)
-                        next_pending = float(next_pending)
-                        
-                        if pd.notna(current_pending) and pd.notna(next_pending):
-                            if current_pending > next_pending:  # Pending amount decreased
-                                styles[col_idx] = 'background-color: #92D050'  # Green for improvement
-                            elif current_pending < next_pending:  # Pending amount increased
-                                styles[col_idx] = 'background-color: #FF7575'  # Red for deterioration
-                    except:
-                        pass
-                        
-        return styles
-    
+    # Compare each date's pending amount with the next date's
+    column_pairs = [
+        (f'Pending_{date}', f'Pending_{next_date}')
+        for date, next_date in zip(dates, dates[1:])
+        if f'Pending_{date}' in df.columns and f'Pending_{next_date}' in df.columns
+    ]
+    styles = column_pair_styles(df, column_pairs, lower_is_better=False)
+
     # Format numbers and apply highlighting
-    return df.style.apply(highlight_pending_changes, axis=1)\
+    return df.style.apply(lambda _: styles, axis=None)\
                   .format({col: '₹{:,.2f}' for col in df.columns if col != 'Branch Name'})
 
 def show_comparative_analysis(filtered_df, dates, selected_branches):
@@ -887,31 +1436,18 @@ def show_comparative_analysis(filtered_df, dates, selected_branches):
     st.subheader("Weekly Pending Amount Comparison")
     
     try:
-        # Create comparison DataFrame
-        comparison_df = pd.DataFrame()
-        comparison_df['Branch Name'] = selected_branches
-        
-        # Add data for selected dates
-        for date in dates:
-            balance_col = f'Balance_{date}'
-            pending_col = f'Pending_{date}'
-            
-            comparison_df[balance_col] = [
-                filtered_df[filtered_df['Branch Name'] == branch][balance_col].iloc[0]
-                for branch in selected_branches
-            ]
-            comparison_df[pending_col] = [
-                filtered_df[filtered_df['Branch Name'] == branch][pending_col].iloc[0]
-                for branch in selected_branches
-            ]
+        # Create comparison DataFrame with a single lookup by branch
+        comparison_columns = [f'{kind}_{date}' for date in dates for kind in ['Balance', 'Pending']]
+        comparison_df = (
+            filtered_df.drop_duplicates('Branch Name')
+            .set_index('Branch Name')
+            .reindex(selected_branches)[comparison_columns]
+            .rename_axis('Branch Name')
+            .reset_index()
+        )
         
         # Display styled table
-        styled_df = style_comparison_df(comparison_df, dates)
-        st.dataframe(
-            styled_df,
-            height=400,
-            use_container_width=True
-        )
+        show_paginated_table(comparison_df, lambda page: style_comparison_df(page, dates), key="weekly_comparison")
         
         # Add summary analytics
         st.markdown("### Summary of Changes")
@@ -946,27 +1482,14 @@ def show_comparative_analysis(filtered_df, dates, selected_branches):
         
         # Summary metrics
         st.markdown("### Overall Metrics")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            latest_total = comparison_df[f'Pending_{dates[0]}'].sum()
-            prev_total = comparison_df[f'Pending_{dates[1]}'].sum()
-            change = latest_total - prev_total
-            display_custom_metric(
-                "Total Pending Change",
-                f"₹{change:,.2f}",
-                delta=-change,  # Negative is good for pending
-                delta_type="inverse"
-            )
-        
-        with col2:
-            improvement = ((prev_total - latest_total) / prev_total * 100)
-            display_custom_metric(
-                "Improvement Percentage",
-                f"{improvement:.2f}%",
-                delta=improvement,
-                delta_type="inverse"
-            )
+        latest_total = comparison_df[f'Pending_{dates[0]}'].sum()
+        prev_total = comparison_df[f'Pending_{dates[1]}'].sum()
+        change = latest_total - prev_total
+        improvement = ((prev_total - latest_total) / prev_total * 100)
+        display_metric_row([
+            dict(title="Total Pending Change", value=f"₹{change:,.2f}", delta=-change, delta_type="inverse"),  # Negative is good for pending
+            dict(title="Improvement Percentage", value=f"{improvement:.2f}%", delta=improvement, delta_type="inverse")
+        ])
             
     except Exception as e:
         st.error(f"Error in comparative analysis: {str(e)}")
@@ -983,67 +1506,550 @@ def add_breadcrumb_navigation(department, report):
     </div>
     """, unsafe_allow_html=True)
 
-def display_custom_metric(title, value, delta=None, delta_type="normal"):
+# Stylesheets added to the page on demand with inject_styles()
+STYLESHEETS = {
+    "metric_card": """
+        .metric-row {
+            display: grid;
+            gap: 1rem;
+        }
+
+        .metric-card {
+            background: rgba(255, 255, 255, 0.25); /* Semi-transparent white for glass effect */
+            backdrop-filter: blur(5px);
+            -webkit-backdrop-filter: blur(5px);
+            border-radius: 15px;
+            padding: 20px;
+            margin: 15px;
+            width: 230px;  /* Fixed width */
+            height: 160px; /* Fixed height */
+            display: flex;
+            flex-direction: column;
+            justify-content: center;
+            align-items: center;
+            text-align: center;
+            transition: all 0.5s ease-in-out;
+            cursor: pointer;
+            color: #333; /* Dark text for contrast */
+            box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+            border: 1px solid rgba(255,255,255,0.2);
+        }
+
+        .metric-card:hover {
+            transform: translateY(-5px) scale(1.05);
+            box-shadow: 0 8px 20px rgba(0,0,0,0.2);
+            border: 1px solid rgba(0, 173, 239, 0.4);
+        }
+    """,
+    "task_cards": """
+        .task-card-container {
+            position: relative;
+            margin-bottom: 20px;
+        }
+        .task-card {
+            background: rgba(255, 255, 255, 0.25);
+            backdrop-filter: blur(8px);
+            -webkit-backdrop-filter: blur(8px);
+            border-radius: 10px;
+            padding: 20px;
+            margin: 10px;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+            transition: all 0.3s ease;
+            overflow: hidden;
+            position: relative;
+        }
+        .task-card:hover {
+            box-shadow: 0 4px 15px rgba(0,0,0,0.15);
+            transform: translateY(-5px);
+        }
+        .task-title {
+            font-size: 1.2em;
+            font-weight: bold;
+            color: #3f51b5;
+            position: relative;
+            margin-bottom: 10px;
+        }
+        .task-title::after {
+            content: "";
+            display: block;
+            width: 40px;
+            height: 3px;
+            background: #3f51b5;
+            margin-top: 5px;
+            border-radius: 2px;
+        }
+        .task-quickinfo {
+            font-size: 0.9em;
+            color: #333;
+            margin-bottom: 5px;
+        }
+        .overdue {border-left: 4px solid #F44336; padding-left: 16px;}
+        .due-soon {border-left: 4px solid #FFC107; padding-left: 16px;}
+        .completed {border-left: 4px solid #4CAF50; padding-left: 16px;}
+        .task-grid {
+            display: grid;
+            grid-template-columns: repeat(3, minmax(0, 1fr));
+            gap: 1rem;
+        }
+        .task-details summary {
+            cursor: pointer;
+            font-size: 0.9em;
+            color: #3f51b5;
+            margin-top: 10px;
+        }
+        .task-details[open] summary {
+            margin-bottom: 5px;
+        }
+    """,
+    "welcome": """
+        @keyframes gradientBackground {
+            0% { background-position: 0% 50%; }
+            50% { background-position: 100% 50%; }
+            100% { background-position: 0% 50%; }
+        }
+        .cinematic-container {
+            padding: 50px 20px;
+            text-align: center;
+            background: linear-gradient(270deg, #ff416c, #ff4b2b, #ff9a00, #ffd700, #007bff, #0056b3);
+            background-size: 800% 800%;
+            animation: gradientBackground 10s ease infinite;
+            border-radius: 20px;
+            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
+            margin-bottom: 30px;
+        }
+        .cinematic-title {
+            font-size: 3em;
+            font-weight: bold;
+            color: #ffffff !important;
+            text-shadow: 0 0 30px rgba(0, 0, 0, 0.6);
+            opacity: 0;
+            animation: fadeIn 2.5s ease-in-out forwards;
+        }
+        @keyframes fadeIn {
+            0% { opacity: 0; transform: translateY(20px); }
+            100% { opacity: 1; transform: translateY(0); }
+        }
+        .fade-out {
+            animation: fadeOut 2s ease-in-out forwards;
+        }
+        @keyframes fadeOut {
+            0% { opacity: 1; }
+            100% { opacity: 0; }
+        }
+        .get-started-button {
+            background: linear-gradient(45deg, #007bff, #00c6ff);
+            color: #ffffff;
+            padding: 15px 30px;
+            font-size: 1.5em;
+            font-weight: bold;
+            border: none;
+            border-radius: 50px;
+            cursor: pointer;
+            box-shadow: 0px 6px 15px rgba(0, 0, 0, 0.2);
+            transition: transform 0.3s, box-shadow 0.3s;
+        }
+        .get-started-button:hover {
+            transform: translateY(-5px);
+            box-shadow: 0px 12px 25px rgba(0, 0, 0, 0.3);
+        }
+
+        /* Updated card styling for glass/blur effect */
+        .card {
+            margin: 20px auto;
+            max-width: 1200px;
+            padding: 20px;
+            font-size: 1.2em;
+            color: #333;
+            text-align: left;
+            line-height: 1.6;
+            background: rgba(255, 255, 255, 0.25);
+            backdrop-filter: blur(8px);
+            -webkit-backdrop-filter: blur(8px);
+            border-radius: 15px;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+            opacity: 0;
+            animation: fadeInStep 2s ease-in-out forwards;
+            transition: all 0.3s ease;
+        }
+
+        .card:hover {
+            box-shadow: 0 8px 30px rgba(0,0,0,0.25);
+            transform: translateY(-5px);
+        }
+
+        @keyframes fadeInStep {
+            0% { opacity: 0; transform: translateY(20px); }
+            100% { opacity: 1; transform: translateY(0); }
+        }
     """
-    Display a custom metric card with a glass blur effect, hover animation, and consistent styling.
+}
+
+def inject_styles(name):
+    """
+    Add a STYLESHEETS entry to the page, at most once per script run.
+
+    A style element only lasts for the run that emitted it, so main() clears the
+    record of injected sheets at the start of every run.
     """
+    injected = st.session_state.setdefault('injected_styles', set())
+    if name not in injected:
+        st.markdown(f"<style>{STYLESHEETS[name]}</style>", unsafe_allow_html=True)
+        injected.add(name)
 
+def metric_card_html(title, value, delta=None, delta_type="normal"):
+    """HTML of one glass metric card."""
     # Determine delta arrow and color
     delta_arrow = "↑" if delta_type == "normal" else "↓"
     delta_color = "#E74C3C" if delta_type == "normal" else "#27AE60"
 
-    # Inject CSS for the glass blur metric card
-    st.markdown("""
-        <style>
-            .metric-card {
-                background: rgba(255, 255, 255, 0.25); /* Semi-transparent white for glass effect */
-                backdrop-filter: blur(5px);
-                -webkit-backdrop-filter: blur(5px);
-                border-radius: 15px;
-                padding: 20px;
-                margin: 15px;
-                width: 230px;  /* Fixed width */
-                height: 160px; /* Fixed height */
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                align-items: center;
-                text-align: center;
-                transition: all 0.5s ease-in-out;
-                cursor: pointer;
-                color: #333; /* Dark text for contrast */
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                border: 1px solid rgba(255,255,255,0.2);
-            }
-
-            .metric-card:hover {
-                transform: translateY(-5px) scale(1.05);
-                box-shadow: 0 8px 20px rgba(0,0,0,0.2);
-                border: 1px solid rgba(0, 173, 239, 0.4);
-            }
-        </style>
-    """, unsafe_allow_html=True)
-
     # Delta HTML if applicable
     delta_html = f"""<div style="font-size: 16px; color: {delta_color}; font-weight: 600;">{delta_arrow} {delta}</div>""" if delta else ""
 
-    # Card HTML
-    card_html = f"""
-    <div class="metric-card">
-        <div style="font-size: 16px; font-weight: 500; color: #333333; margin-bottom: 10px;">{title}</div>
-        <div style="font-size: 22px; font-weight: bold; color: #333333; margin-bottom: 10px;">{value}</div>
-        {delta_html}
-    </div>
+    # Joined without newlines: a blank or indented line would end the markdown HTML block
+    return "".join([
+        '<div class="metric-card">',
+        f'<div style="font-size: 16px; font-weight: 500; color: #333333; margin-bottom: 10px;">{title}</div>',
+        f'<div style="font-size: 22px; font-weight: bold; color: #333333; margin-bottom: 10px;">{value}</div>',
+        delta_html,
+        '</div>'
+    ])
+
+def display_custom_metric(title, value, delta=None, delta_type="normal"):
+    """
+    Display a custom metric card with a glass blur effect, hover animation, and consistent styling.
+    """
+    inject_styles("metric_card")
+    st.markdown(metric_card_html(title, value, delta, delta_type), unsafe_allow_html=True)
+
+def display_metric_row(metrics):
     """
+    Display several metric cards side by side in a single element.
 
-    st.markdown(card_html, unsafe_allow_html=True)
+    Each metric is a dict of display_custom_metric arguments (title, value and
+    optionally delta and delta_type).
+    """
+    inject_styles("metric_card")
+    cards = "".join(f"<div>{metric_card_html(**metric)}</div>" for metric in metrics)
+    # One equal-width grid column per card, like st.columns(len(metrics))
+    st.markdown(
+        f'<div class="metric-row" style="grid-template-columns: repeat({len(metrics)}, minmax(0, 1fr));">{cards}</div>',
+        unsafe_allow_html=True
+    )
 
 # Enhanced dashboard display
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and total size.
+
+    sizeof(value) returns the approximate size of a value in bytes. The least recently
+    used entries are evicted once either limit is exceeded; a single value larger than
+    max_bytes is not stored at all.
+    """
+
+    def __init__(self, max_entries, max_bytes, sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.stats["bytes"] -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.stats["bytes"] += size
+            while len(self._entries) > self.max_entries or self.stats["bytes"] > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.stats["bytes"] -= evicted_size
+                self.stats["evictions"] += 1
+
+    def get_or_build(self, key, build):
+        """Return the cached value for key, building and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+# Limits that keep trend charts responsive with many branches
+CHART_CONFIG = {
+    "webgl_trace_threshold": 30,  # switch to WebGL traces above this many series
+    "webgl_point_threshold": 2000,  # ... or above this many points
+    "max_traces": 60,  # above this many series, draw one combined trace per metric
+    "top_n": 10,  # series kept in "Top N + Others" mode
+    "top_n_default_above": 20  # default to "Top N + Others" when more branches are selected
+}
+
+def group_top_n(df, entity_col, date_col, value_col, top_n, others_label="Others"):
+    """Keep the top_n entities by their value on the latest date and fold the rest into one Others series."""
+    latest = df[df[date_col] == df[date_col].max()]
+    top = latest.groupby(entity_col, observed=True)[value_col].sum().nlargest(top_n).index
+    entities = df[entity_col].astype(object)
+    return df.assign(**{entity_col: entities.where(entities.isin(top), others_label)})
+
+def build_trend_figure(df, entity_col, date_col, value_col, title, name_suffix="", line=None):
+    """
+    Line chart of value_col over time with one series per entity, built from a single groupby.
+
+    Above CHART_CONFIG["max_traces"] series the lines are drawn as one trace separated by
+    gaps, with the entity shown on hover, so the figure size does not grow with the number
+    of traces. Large charts use WebGL (Scattergl).
+    """
+    series = df.groupby([entity_col, date_col], sort=True, observed=True)[value_col].sum()
+    entities = series.index.get_level_values(0)
+    dates = series.index.get_level_values(1)
+    values = series.to_numpy(dtype=float)
+
+    # Every entity occupies one contiguous block of the sorted index
+    codes, names = pd.factorize(entities)
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    n_series = len(names)
+
+    use_webgl = n_series > CHART_CONFIG["webgl_trace_threshold"] or len(values) > CHART_CONFIG["webgl_point_threshold"]
+    trace_type = go.Scattergl if use_webgl else go.Scatter
+
+    fig = go.Figure()
+    if n_series > CHART_CONFIG["max_traces"]:
+        # NaN entries break the line between consecutive entities
+        fig.add_trace(trace_type(
+            x=np.insert(dates.to_numpy(dtype=object), boundaries, None),
+            y=np.insert(values, boundaries, np.nan),
+            text=np.insert(np.asarray(entities, dtype=object), boundaries, None),
+            name=f"{n_series} series{name_suffix}",
+            mode='lines+markers',
+            line=line,
+            connectgaps=False,
+            hovertemplate="%{text}<br>%{x}<br>%{y:,.2f}<extra></extra>"
+        ))
+        hovermode = 'closest'
+    else:
+        for name, x, y in zip(names, np.split(dates.to_numpy(), boundaries), np.split(values, boundaries)):
+            fig.add_trace(trace_type(
+                x=x,
+                y=y,
+                name=f"{name}{name_suffix}",
+                mode='lines+markers',
+                line=line
+            ))
+        hovermode = 'x unified'
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Amount (₹)",
+        hovermode=hovermode
+    )
+    return fig
+
+# Size limits of the process-wide figure cache
+FIGURE_CACHE_CONFIG = {
+    "max_entries": 200,
+    "max_bytes": 128 * 1024 * 1024
+}
+
+def estimate_figure_bytes(fig):
+    """Rough size of a figure: the data arrays of its traces plus a fixed overhead per trace."""
+    total = 0
+    for trace in fig.data:
+        total += 1024
+        for prop in ('x', 'y', 'text', 'values', 'labels', 'marker.color'):
+            value = trace[prop] if prop in trace else None
+            if value is not None and not isinstance(value, str):
+                total += np.asarray(value).nbytes
+    return total
+
+@st.cache_resource
+def get_figure_cache():
+    """Create the process-wide LRU cache of built Plotly figures."""
+    return LRUCache(FIGURE_CACHE_CONFIG["max_entries"], FIGURE_CACHE_CONFIG["max_bytes"], estimate_figure_bytes)
+
+def cached_figure(entry, report, chart_id, filters, build):
+    """
+    Return the figure made by build(), reusing it while the dataset entry's version and filters are unchanged.
+
+    entry is the store entry the page read its frame from (see get_dataset_entry).
+    filters is a tuple of everything besides the data that changes the figure (widget values).
+    Cached figures are shared between sessions and must not be modified.
+    """
+    filter_key = hashlib.sha1(repr(filters).encode()).hexdigest()
+    return get_figure_cache().get_or_build((dataset_version(entry), report, chart_id, filter_key), build)
+
+# Download formats offered for every report export
+EXPORT_FORMATS = {
+    "Excel": {"extension": "xlsx", "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+    "CSV": {"extension": "csv", "mime": "text/csv"},
+    "Parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"}
+}
+
+# Size limits of the process-wide cache of generated export files
+EXPORT_CACHE_CONFIG = {
+    "max_entries": 32,
+    "max_bytes": 256 * 1024 * 1024
+}
+
+EXCEL_MAX_ROWS = 1_048_576
+
+# Rows converted to Python values at a time while writing an Excel export
+EXPORT_CHUNK_ROWS = 10_000
+
+def iter_export_rows(df, executor, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield the rows of a frame as tuples, with missing values as None, one chunk at a time.
+
+    The next chunk is converted on the executor while the current one is consumed, so
+    at most two chunks are held in memory.
+    """
+    def convert(start):
+        chunk = df.iloc[start:start + chunk_rows]
+        return list(chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None))
+
+    starts = range(0, len(df), chunk_rows)
+    pending = executor.submit(convert, starts[0]) if starts else None
+    for i in range(len(starts)):
+        rows = pending.result()
+        if i + 1 < len(starts):
+            pending = executor.submit(convert, starts[i + 1])
+        yield from rows
+
+def write_excel_export(sheets):
+    """
+    Write {sheet name: frame} to an xlsx file row by row and return its bytes.
+
+    constant_memory mode flushes every row to disk once the next row starts, so the
+    workbook never holds more than one row in memory. That only works for row-ordered
+    writes, which is why the rows are written here rather than with DataFrame.to_excel.
+    """
+    for name, df in sheets.items():
+        if len(df) >= EXCEL_MAX_ROWS:
+            raise ValueError(f"Sheet '{name}' has {len(df):,} rows, more than Excel supports. Export as CSV or Parquet instead.")
+
+    # xlsxwriter writes one row at a time, so one worker converts the next chunk of
+    # rows while the current chunk is written
+    with tempfile.TemporaryDirectory() as tmpdir, ThreadPoolExecutor(max_workers=1, thread_name_prefix="export") as executor:
+        path = os.path.join(tmpdir, "export.xlsx")
+        workbook = xlsxwriter.Workbook(path, {
+            "constant_memory": True,
+            "tmpdir": tmpdir,
+            "default_date_format": "yyyy-mm-dd"
+        })
+        for name, df in sheets.items():
+            sheet = workbook.add_worksheet(name[:31])
+            sheet.write_row(0, 0, [str(col) for col in df.columns])
+            # Missing values become empty cells
+            for row_number, row in enumerate(iter_export_rows(df, executor), start=1):
+                sheet.write_row(row_number, 0, row)
+        workbook.close()
+        with open(path, "rb") as f:
+            return f.read()
+
+def write_csv_export(sheets):
+    """One CSV file, or a zip with one CSV per sheet."""
+    if len(sheets) == 1:
+        return next(iter(sheets.values())).to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, df in sheets.items():
+            archive.writestr(f"{name}.csv", df.to_csv(index=False))
+    return buffer.getvalue()
+
+def write_parquet_export(sheets):
+    """One Parquet file, or a zip with one Parquet file per sheet."""
+    def to_parquet(df):
+        buffer = io.BytesIO()
+        df.rename(columns=str).to_parquet(buffer, index=False)
+        return buffer.getvalue()
+
+    if len(sheets) == 1:
+        return to_parquet(next(iter(sheets.values())))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for name, df in sheets.items():
+            archive.writestr(f"{name}.parquet", to_parquet(df))
+    return buffer.getvalue()
+
+EXPORT_WRITERS = {
+    "Excel": write_excel_export,
+    "CSV": write_csv_export,
+    "Parquet": write_parquet_export
+}
+
+@st.cache_resource
+def get_export_cache():
+    """Create the process-wide LRU cache of generated export files."""
+    return LRUCache(EXPORT_CACHE_CONFIG["max_entries"], EXPORT_CACHE_CONFIG["max_bytes"], lambda export: len(export[0]))
+
+def export_cache_key(datasets, report, filters, export_format):
+    """Cache key of an export built from one dataset or a list of datasets, from the versions loaded now."""
+    datasets = [datasets] if isinstance(datasets, str) else datasets
+    filter_key = hashlib.sha1(repr(filters).encode()).hexdigest()
+    return (tuple(get_dataset_version(dataset) for dataset in datasets), report, filter_key, export_format)
+
+def build_export(sheets, export_format):
+    """Return (file bytes, extension, mime type) of sheets written in export_format."""
+    file_format = EXPORT_FORMATS[export_format]
+    data = EXPORT_WRITERS[export_format](sheets)
+    if export_format != "Excel" and len(sheets) > 1:
+        # Several CSV/Parquet sheets are bundled in a zip
+        return data, "zip", "application/zip"
+    return data, file_format["extension"], file_format["mime"]
+
+def show_export_controls(datasets, report, filters, build_sheets, file_stem, label, download_label, container=None):
+    """
+    Export button with a format choice and, once clicked, a download button for the file.
+
+    build_sheets() returns {sheet name: frame}. The file is generated once per version
+    of the datasets it uses, filters and format, and later downloads are served from
+    the export cache.
+    """
+    container = container or st.sidebar
+    export_format = container.selectbox("Export Format", list(EXPORT_FORMATS), key=f"{report}_export_format")
+
+    # The download stays available until the data, filters or format change
+    request_key = f"{report}_export_request"
+    sheets = None
+    if container.button(label):
+        # Building the sheets may load datasets the page does not show, so the key is
+        # read afterwards; nothing is loaded for the export before it is requested
+        sheets = build_sheets()
+        st.session_state[request_key] = export_cache_key(datasets, report, filters, export_format)
+    key = export_cache_key(datasets, report, filters, export_format)
+    if st.session_state.get(request_key) != key:
+        return
+
+    data, extension, mime = get_export_cache().get_or_build(
+        key, lambda: build_export(sheets if sheets is not None else build_sheets(), export_format)
+    )
+    container.download_button(
+        label=download_label,
+        data=data,
+        file_name=f"{file_stem}.{extension}",
+        mime=mime
+    )
+
 def show_collections_dashboard():
     # Load data from Google Drive
-    df = load_data_from_drive(FILE_IDS['collections_data'])
-    if df is None:
+    entry = get_dataset_entry('collections_data')
+    if entry is None:
         return
+    df = entry["df"]
 
     # If 'Branch Name' column is not found, handle gracefully
     if 'Branch Name' not in df.columns:
@@ -1084,6 +2090,11 @@ def show_collections_dashboard():
     filtered_df_1 = filtered_df[filtered_df['Date'] == selected_date_1]
     filtered_df_2 = filtered_df[filtered_df['Date'] == selected_date_2]
 
+    # Analysis frames computed below are reused by the full analysis export
+    trend_stats = None
+    comparison_df = None
+    compare_dates = []
+
     # Key Metrics Dashboard
     try:
         # Ensure necessary columns are present
@@ -1099,67 +2110,26 @@ def show_collections_dashboard():
         top_balance_branch_1 = filtered_df_1.loc[filtered_df_1['Balance As On'].idxmax()]['Branch Name'] if not filtered_df_1.empty else "N/A"
         
         # Best Performing Branch based on Decreasing Pending Amount Continuously
-        available_dates_sorted = sorted(available_dates)  # Earliest to latest
-        performance_records = {}
-
-        for branch in selected_branches:
-            branch_data = df[df['Branch Name'] == branch].sort_values(by='Date')
-            decreasing_count = 0
-            increasing_count = 0
-
-            for i in range(1, len(available_dates_sorted)):
-                current_date = available_dates_sorted[i]
-                previous_date = available_dates_sorted[i - 1]
-
-                if (previous_date in branch_data['Date'].values) and (current_date in branch_data['Date'].values):
-                    current_pending = branch_data.loc[branch_data['Date'] == current_date, 'Pending Amount'].values[0]
-                    previous_pending = branch_data.loc[branch_data['Date'] == previous_date, 'Pending Amount'].values[0]
-
-                    if current_pending < previous_pending:
-                        decreasing_count += 1
-                    elif current_pending > previous_pending:
-                        increasing_count += 1
-
-            performance_records[branch] = {
-                "decreasing_count": decreasing_count,
-                "increasing_count": increasing_count
-            }
+        trend_stats = compute_trend_statistics(df, 'Branch Name', 'Date', 'Pending Amount', entities=selected_branches)
 
         # Determine Best and Poor Performing Branch
-        best_performing_branch = max(performance_records, key=lambda x: performance_records[x]['decreasing_count'], default="N/A")
-        filtered_performance_records = {k: v for k, v in performance_records.items() if k != best_performing_branch}
-        poor_performing_branch = max(filtered_performance_records, key=lambda x: filtered_performance_records[x]['increasing_count'], default="N/A")
+        best_performing_branch = trend_stats['decrease_count'].idxmax() if not trend_stats.empty else "N/A"
+        other_branches = trend_stats.drop(index=best_performing_branch, errors='ignore')
+        poor_performing_branch = other_branches['increase_count'].idxmax() if not other_branches.empty else "N/A"
         
         # Display Metrics for the first selected date
-        col1, col2, col3, col4, col5 = st.columns(5)
-
-        with col1:
-            display_custom_metric(
-                "Total Balance",
-                f"₹{total_balance_1:,.2f}",
+        display_metric_row([
+            dict(
+                title="Total Balance",
+                value=f"₹{total_balance_1:,.2f}",
                 delta=f"₹{total_reduced_1:,.2f}",
                 delta_type="inverse" if total_reduced_1 < 0 else "normal"
-            )
-        with col2:
-            display_custom_metric(
-                "Total Pending",
-                f"₹{total_pending_1:,.2f}"
-            )
-        with col3:
-            display_custom_metric(
-                "Collection Ratio",
-                f"{collection_ratio_1:.1f}%"
-            )
-        with col4:
-            display_custom_metric(
-                "Best Performing Branch",
-                top_balance_branch_1
-            )
-        with col5:
-            display_custom_metric(
-                "Poor Performing Branch",
-                poor_performing_branch
-            )
+            ),
+            dict(title="Total Pending", value=f"₹{total_pending_1:,.2f}"),
+            dict(title="Collection Ratio", value=f"{collection_ratio_1:.1f}%"),
+            dict(title="Best Performing Branch", value=top_balance_branch_1),
+            dict(title="Poor Performing Branch", value=poor_performing_branch)
+        ])
         
     except KeyError as e:
         st.error(f"Error calculating metrics: {str(e)}")
@@ -1174,55 +2144,32 @@ def show_collections_dashboard():
         # Interactive Selector to Show Balance, Pending, or Both
         analysis_type = st.radio("Select Analysis Type", options=["Balance Amount", "Pending Amount", "Both"], index=0)
 
+        # Many branches are summarised as the largest ones plus an Others line
+        plot_modes = ["Top N + Others", "All Selected Branches"]
+        many_branches = filtered_df['Branch Name'].nunique() > CHART_CONFIG["top_n_default_above"]
+        plot_mode = st.radio("Branches to Plot", options=plot_modes, index=0 if many_branches else 1, horizontal=True)
+        if plot_mode == "Top N + Others":
+            top_n = st.slider("Number of Branches", min_value=1, max_value=50, value=CHART_CONFIG["top_n"])
+
         try:
             # Prepare trend data safely
             if not filtered_df.empty:
+                trend_charts = []
                 if analysis_type == "Balance Amount" or analysis_type == "Both":
-                    # Balance Amount Trend Chart
-                    fig_balance = go.Figure()
-
-                    for branch in selected_branches:
-                        branch_data = filtered_df[filtered_df['Branch Name'] == branch]
-                        if not branch_data.empty:
-                            # Balance line
-                            fig_balance.add_trace(go.Scatter(
-                                x=branch_data['Date'],
-                                y=branch_data['Balance As On'],
-                                name=f"{branch} - Balance",
-                                mode='lines+markers'
-                            ))
-
-                    fig_balance.update_layout(
-                        title="Balance Amount Trend",
-                        xaxis_title="Date",
-                        yaxis_title="Amount (₹)",
-                        hovermode='x unified'
-                    )
-                    st.plotly_chart(fig_balance, use_container_width=True)
-
+                    trend_charts.append(('Balance As On', "Balance Amount Trend", " - Balance", None))
                 if analysis_type == "Pending Amount" or analysis_type == "Both":
-                    # Pending Amount Trend Chart
-                    fig_pending = go.Figure()
-
-                    for branch in selected_branches:
-                        branch_data = filtered_df[filtered_df['Branch Name'] == branch]
-                        if not branch_data.empty:
-                            # Pending line
-                            fig_pending.add_trace(go.Scatter(
-                                x=branch_data['Date'],
-                                y=branch_data['Pending Amount'],
-                                name=f"{branch} - Pending",
-                                mode='lines+markers',
-                                line=dict(dash='dot')
-                            ))
-
-                    fig_pending.update_layout(
-                        title="Pending Amount Trend",
-                        xaxis_title="Date",
-                        yaxis_title="Amount (₹)",
-                        hovermode='x unified'
+                    trend_charts.append(('Pending Amount', "Pending Amount Trend", " - Pending", dict(dash='dot')))
+
+                for value_col, title, name_suffix, line in trend_charts:
+                    chart_df = filtered_df
+                    if plot_mode == "Top N + Others":
+                        chart_df = group_top_n(filtered_df, 'Branch Name', 'Date', value_col, top_n)
+                    fig = cached_figure(
+                        entry, "Branch Reco Trend", f"trend:{value_col}",
+                        (tuple(selected_branches), plot_mode, top_n if plot_mode == "Top N + Others" else None),
+                        lambda: build_trend_figure(chart_df, 'Branch Name', 'Date', value_col, title, name_suffix=name_suffix, line=line)
                     )
-                    st.plotly_chart(fig_pending, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True)
 
             else:
                 st.warning("No trend data available for selected branches")
@@ -1239,12 +2186,15 @@ def show_collections_dashboard():
                 filtered_df['Net Position'] = filtered_df['Balance As On'] - filtered_df['Pending Amount']
 
                 # Performance Chart
-                fig_perf = px.bar(
-                    filtered_df,
-                    x='Branch Name',
-                    y=['Balance As On', 'Pending Amount', 'Net Position'],
-                    title="Branch Performance",
-                    barmode='group'
+                fig_perf = cached_figure(
+                    entry, "Branch Reco Trend", "performance", (tuple(selected_branches),),
+                    lambda: px.bar(
+                        filtered_df,
+                        x='Branch Name',
+                        y=['Balance As On', 'Pending Amount', 'Net Position'],
+                        title="Branch Performance",
+                        barmode='group'
+                    )
                 )
                 st.plotly_chart(fig_perf, use_container_width=True)
 
@@ -1263,49 +2213,29 @@ def show_collections_dashboard():
     with tab3:
         st.subheader("Comparative Analysis")
         try:
-            if not filtered_df_1.empty and not filtered_df_2.empty:
+            compare_dates = st.multiselect(
+                "Dates to Compare",
+                options=available_dates,
+                default=[selected_date_1, selected_date_2],
+                format_func=lambda x: str(pd.Timestamp(x).date())
+            )
+
+            if len(compare_dates) < 2:
+                st.warning("Select at least two dates to compare")
+            elif not filtered_df.empty:
                 # Create comparison DataFrame
-                comparison_df = pd.DataFrame()
-                comparison_df['Branch Name'] = selected_branches
-
-                # Add data for the selected dates
-                comparison_df[f'Balance ({selected_date_1.date()})'] = [
-                    filtered_df_1[filtered_df_1['Branch Name'] == branch]['Balance As On'].iloc[0] if branch in filtered_df_1['Branch Name'].values else 0
-                    for branch in selected_branches
-                ]
-                comparison_df[f'Pending ({selected_date_1.date()})'] = [
-                    filtered_df_1[filtered_df_1['Branch Name'] == branch]['Pending Amount'].iloc[0] if branch in filtered_df_1['Branch Name'].values else 0
-                    for branch in selected_branches
-                ]
-                comparison_df[f'Balance ({selected_date_2.date()})'] = [
-                    filtered_df_2[filtered_df_2['Branch Name'] == branch]['Balance As On'].iloc[0] if branch in filtered_df_2['Branch Name'].values else 0
-                    for branch in selected_branches
-                ]
-                comparison_df[f'Pending ({selected_date_2.date()})'] = [
-                    filtered_df_2[filtered_df_2['Branch Name'] == branch]['Pending Amount'].iloc[0] if branch in filtered_df_2['Branch Name'].values else 0
-                    for branch in selected_branches
-                ]
-
-                # Style the dataframe to highlight changes directly in the latest pending column
-                pending_col_1 = f'Pending ({selected_date_2.date()})'  # Previous date
-                pending_col_2 = f'Pending ({selected_date_1.date()})'  # Latest date
-
-                def highlight_latest_pending(row):
-                    try:
-                        if row[pending_col_2] < row[pending_col_1]:  # Pending decreased (improvement)
-                            return ['background-color: #92D050' if col == pending_col_2 else '' for col in row.index]  # Green
-                        elif row[pending_col_2] > row[pending_col_1]:  # Pending increased (deterioration)
-                            return ['background-color: #FF7575' if col == pending_col_2 else '' for col in row.index]  # Red
-                        else:
-                            return ['' for _ in row.index]
-                    except:
-                        return ['' for _ in row.index]
+                comparison_df = build_comparison_frame(filtered_df, selected_branches, compare_dates)
+
+                # Highlight each pending column against the next selected date
+                pending_cols = [f'Pending ({pd.Timestamp(date).date()})' for date in compare_dates]
 
-                styled_df = comparison_df.style.apply(highlight_latest_pending, axis=1)
+                def style_page(page):
+                    styles = column_pair_styles(page, list(zip(pending_cols, pending_cols[1:])))
+                    return page.style.apply(lambda _: styles, axis=None)
 
                 # Display styled comparison table
                 st.markdown("### Balance and Pending Comparison")
-                st.dataframe(styled_df, height=400, use_container_width=True)
+                show_paginated_table(comparison_df, style_page, key="collections_comparison")
 
             else:
                 st.warning("No comparison data available for selected dates")
@@ -1314,23 +2244,32 @@ def show_collections_dashboard():
             st.error(f"Error in comparative analysis: {str(e)}")
             st.write("Error details:", str(e))
 
+    def build_analysis_sheets():
+        # Only frames that are already computed or cached are exported, nothing is recomputed here
+        sheets = {
+            'Raw Data': filtered_df,
+            'Comparison': comparison_df,
+            'Branch Streaks': trend_stats.rename_axis('Branch Name').reset_index() if trend_stats is not None else None,
+            'SDR Trend': get_trend_long(get_dataset_entry('sdr_trend')),
+            'TSG Trend': get_trend_long(get_dataset_entry('tsg_trend'))
+        }
+        return {name: frame for name, frame in sheets.items() if frame is not None}
+
     # Export Options
     with st.sidebar.expander("Export Options"):
         st.subheader("Export Analysis")
-        if st.button("Export Complete Analysis"):
-            try:
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    filtered_df.to_excel(writer, sheet_name='Raw Data', index=False)
-
-                st.sidebar.download_button(
-                    label="📥 Download Full Report",
-                    data=output.getvalue(),
-                    file_name=f"collection_analysis_{selected_date_1}_vs_{selected_date_2}.xlsx",
-                    mime="application/vnd.ms-excel"
-                )
-            except Exception as e:
-                st.sidebar.error(f"Error exporting data: {str(e)}")
+        try:
+            show_export_controls(
+                ['collections_data', 'sdr_trend', 'tsg_trend'], "Branch Reco Trend",
+                (tuple(selected_branches), tuple(compare_dates)),
+                build_analysis_sheets,
+                file_stem=f"collection_analysis_{pd.Timestamp(selected_date_1).date()}_vs_{pd.Timestamp(selected_date_2).date()}",
+                label="Export Complete Analysis",
+                download_label="📥 Download Full Report",
+                container=st
+            )
+        except Exception as e:
+            st.sidebar.error(f"Error exporting data: {str(e)}")
 
 def style_sdr_trend(df):
     """
@@ -1339,54 +2278,41 @@ def style_sdr_trend(df):
     - Red when value increases (deterioration)
     - Yellow for no change
     """
-    def color_values(val, col_name):
-        try:
-            if col_name == 'Reduced OS':
-                # For Reduced OS column, negative is good (green)
-                if pd.isna(val):
-                    return ''
-                elif val < 0:
-                    return 'background-color: #92D050'  # Green
-                elif val > 0:
-                    return 'background-color: #FF7575'  # Red
-                else:
-                    return 'background-color: #FFFF00'  # Yellow
-            else:
-                # Logic for date columns
-                date_cols = [col for col in df.columns if col not in ['Ageing Category', 'Reduced OS']]
-                date_cols = [col for col in date_cols if pd.api.types.is_numeric_dtype(df[col])]
-                date_cols.sort(reverse=True)  # Most recent first
-                
-                if col_name in date_cols:
-                    col_idx = date_cols.index(col_name)
-                    if col_idx < len(date_cols) - 1:  # If not the last date
-                        next_col = date_cols[col_idx + 1]
-                        current_val = val
-                        next_val = df[next_col].loc[df[col_name] == val].iloc[0]
-                        
-                        if pd.isna(current_val) or pd.isna(next_val):
-                            return ''
-                        elif current_val < next_val:  # Decreased (improved)
-                            return 'background-color: #92D050'  # Green
-                        elif current_val > next_val:  # Increased (deteriorated)
-                            return 'background-color: #FF7575'  # Red
-                        else:
-                            return 'background-color: #FFFF00'  # Yellow
-            return ''
-        except Exception as e:
-            return f"Error: {str(e)}"
+    # Each date column is compared with the previous date in the same row
+    date_cols = [col for col in df.columns if col not in ['Ageing Category', 'Reduced OS']]
+    date_cols = [col for col in date_cols if pd.api.types.is_numeric_dtype(df[col])]
+    date_cols.sort(reverse=True)  # Most recent first
+    styles = column_pair_styles(df, list(zip(date_cols, date_cols[1:])), unchanged_style=UNCHANGED_STYLE)
+
+    # For Reduced OS column, negative is good (green)
+    if 'Reduced OS' in df.columns:
+        reduced_os = numeric_values(df, ['Reduced OS'])
+        styles[['Reduced OS']] = change_styles(reduced_os, np.zeros_like(reduced_os), unchanged_style=UNCHANGED_STYLE)
 
     # Apply styling to the DataFrame.
-    styled = df.style.apply(lambda x: [color_values(val, col) for val, col in zip(x, x.index)], axis=1)
+    styled = df.style.apply(lambda _: styles, axis=None)
     
     # Format numbers with two decimal places.
-    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
+    # Any numeric dtype: optimize_dtypes stores whole-number amounts as int32
+    numeric_columns = df.select_dtypes('number').columns
     return styled.format("{:.2f}", subset=numeric_columns)
 
+# Columns of each trend dataset that are not dates
+TREND_STATIC_COLUMNS = {
+    'sdr_trend': ['Ageing Category', 'Reduced OS'],
+    'tsg_trend': ['Ageing Category']
+}
+
+def build_trend_long(df, static_columns, id_column='Ageing Category'):
+    """Reshape a wide trend frame (one column per date) into Ageing Category / Date / Amount rows, most recent date first."""
+    date_columns = sorted((col for col in df.columns if col not in static_columns), reverse=True)
+    return df.melt(id_vars=[id_column], value_vars=date_columns, var_name='Date', value_name='Amount')
+
 def show_sdr_dashboard():
-    df = load_sdr_trend()
-    if df is None:
+    entry = get_dataset_entry('sdr_trend')
+    if entry is None:
         return
+    df = entry["df"]
     
     add_breadcrumb_navigation("CSD", "CSD SDR Trend")
     
@@ -1394,7 +2320,7 @@ def show_sdr_dashboard():
 
     try:
         # Identify date columns for plotting
-        static_columns = ['Ageing Category', 'Reduced OS']
+        static_columns = TREND_STATIC_COLUMNS['sdr_trend']
         date_columns = [col for col in df.columns if col not in static_columns]
 
         # Check if the date columns are correctly parsed and available
@@ -1411,36 +2337,24 @@ def show_sdr_dashboard():
             # Display Highlights Trend
             st.subheader("Highlights Trend")
             st.markdown("A detailed analysis of the changes over different periods, indicating improvements and deteriorations.")
-            styled_df = style_sdr_trend(df)
-            st.dataframe(styled_df, height=400, use_container_width=True)
+            show_paginated_table(df, style_sdr_trend, key="sdr_highlights")
 
             # Display Summary Metrics
             st.markdown("### Summary Metrics")
-            col1, col2, col3 = st.columns(3)
-
-        with col1:
             total_reduced = df['Reduced OS'].sum()
-            display_custom_metric("Total Reduced OS", f"{total_reduced:,.2f}", delta=total_reduced, delta_type="inverse")
-
-        with col2:
             latest_total = df[date_columns[0]].sum()
             prev_total = df[date_columns[1]].sum()
             change = latest_total - prev_total
-            display_custom_metric(
-                f"Latest Total ({date_columns[0]})",
-                f"{latest_total:,.2f}",
-                delta=-change,
-                delta_type="inverse"
-            )
-
-        with col3:
             reduction_percent = ((prev_total - latest_total) / prev_total * 100) if prev_total != 0 else 0
-            display_custom_metric("Week-on-Week Improvement", f"{reduction_percent:.2f}%", delta=reduction_percent, delta_type="inverse")
+            display_metric_row([
+                dict(title="Total Reduced OS", value=f"{total_reduced:,.2f}", delta=total_reduced, delta_type="inverse"),
+                dict(title=f"Latest Total ({date_columns[0]})", value=f"{latest_total:,.2f}", delta=-change, delta_type="inverse"),
+                dict(title="Week-on-Week Improvement", value=f"{reduction_percent:.2f}%", delta=reduction_percent, delta_type="inverse")
+            ])
 
         with tab2:
             # Original SDR Ageing Analysis Section
             st.subheader("SDR Ageing Analysis")
-            styled_df = style_sdr_trend(df)
             st.markdown("Aging Analysis for different SDR categories.")
             st.dataframe(df, height=400, use_container_width=True)
 
@@ -1448,26 +2362,20 @@ def show_sdr_dashboard():
             # Trend Analysis
             st.subheader("Trend Analysis")
 
-            # Prepare trend data in long format for plotting
-            trend_data = []
-            for _, row in df.iterrows():
-                for date in date_columns:
-                    trend_data.append({
-                        'Ageing Category': row['Ageing Category'],
-                        'Date': date,
-                        'Amount': row[date]
-                    })
-
-            trend_df = pd.DataFrame(trend_data)
+            # Trend data in long format for plotting, built once per data version
+            trend_df = get_trend_long(entry)
 
             # Line chart for trends
             try:
-                fig = px.line(
-                    trend_df,
-                    x='Date',  # Ensure 'Date' column is present in trend_df
-                    y='Amount',
-                    color='Ageing Category',
-                    title="SDR Trends by Ageing Category"
+                fig = cached_figure(
+                    entry, "CSD SDR Trend", "trend", (),
+                    lambda: px.line(
+                        trend_df,
+                        x='Date',  # Ensure 'Date' column is present in trend_df
+                        y='Amount',
+                        color='Ageing Category',
+                        title="SDR Trends by Ageing Category"
+                    )
                 )
                 st.plotly_chart(fig, use_container_width=True)
             except Exception as e:
@@ -1484,11 +2392,14 @@ def show_sdr_dashboard():
             with col1:
                 # Pie chart for the latest distribution
                 try:
-                    fig_pie = px.pie(
-                        df,
-                        values=latest_date,
-                        names='Ageing Category',
-                        title=f"Distribution as of {latest_date}"
+                    fig_pie = cached_figure(
+                        entry, "CSD SDR Trend", "distribution", (latest_date,),
+                        lambda: px.pie(
+                            df,
+                            values=latest_date,
+                            names='Ageing Category',
+                            title=f"Distribution as of {latest_date}"
+                        )
                     )
                     st.plotly_chart(fig_pie, use_container_width=True)
                 except Exception as e:
@@ -1496,11 +2407,10 @@ def show_sdr_dashboard():
 
             with col2:
                 # Bar chart for changes
-                df_changes = df.copy()
-                df_changes['Change'] = df_changes[latest_date] - df_changes[prev_date]
-
-                try:
-                    fig_changes = px.bar(
+                def build_changes_chart():
+                    df_changes = df.copy()
+                    df_changes['Change'] = df_changes[latest_date] - df_changes[prev_date]
+                    return px.bar(
                         df_changes,
                         x='Ageing Category',
                         y='Change',
@@ -1508,23 +2418,21 @@ def show_sdr_dashboard():
                         color='Change',
                         color_continuous_scale=['green', 'yellow', 'red']
                     )
+
+                try:
+                    fig_changes = cached_figure(entry, "CSD SDR Trend", "changes", (latest_date, prev_date), build_changes_chart)
                     st.plotly_chart(fig_changes)
                 except Exception as e:
                     st.error(f"Error in plotting bar chart: {str(e)}")
 
         # Export Option
-        if st.sidebar.button("Export SDR Analysis"):
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='SDR Data', index=False)
-                trend_df.to_excel(writer, sheet_name='Trend Analysis', index=False)
-
-            st.sidebar.download_button(
-                label="📥 Download SDR Report",
-                data=buffer.getvalue(),
-                file_name=f"sdr_analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.ms-excel"
-            )
+        show_export_controls(
+            'sdr_trend', "CSD SDR Trend", (),
+            lambda: {'SDR Data': df, 'Trend Analysis': get_trend_long(entry)},
+            file_stem=f"sdr_analysis_{datetime.now().strftime('%Y%m%d')}",
+            label="Export SDR Analysis",
+            download_label="📥 Download SDR Report"
+        )
 
     except Exception as e:
         st.error(f"Error in SDR analysis: {str(e)}")
@@ -1553,55 +2461,29 @@ def style_itss_data(df, aging_categories):
 
 def style_itss_trend(df, selected_date):
     """Style the ITSS tender dataframe with color coding comparing to previous date"""
-    def get_comparison_value(row, col):
-        try:
-            current_value = row[f"{selected_date}_{col}"]
-            dates = sorted([c.split('_')[0] for c in df.columns if '_' in c and col in c], reverse=True)
-            current_date_idx = dates.index(selected_date)
-            if current_date_idx < len(dates) - 1:
-                next_date = dates[current_date_idx + 1]
-                previous_value = row[f"{next_date}_{col}"]
-                if pd.notna(current_value) and pd.notna(previous_value):
-                    return current_value - previous_value
-            return None
-        except:
-            return None
-    
-    def color_changes(val, comparison_val):
-        if pd.isna(val) or val == 0:
-            return ''
-        if comparison_val is not None:
-            if comparison_val < 0:
-                return 'background-color: #92D050'  # Green for decrease
-            elif comparison_val > 0:
-                return 'background-color: #FF7575'  # Red for increase
-        return ''
-    
     # Get aging categories
     aging_categories = ['61-90', '91-120', '121-180', '181-360', '361-720', 'More than 2 Yr']
-    
-    # Create StyleFrame
-    comparison_styles = pd.DataFrame(index=df.index, columns=df.columns)
-    
+
+    # Compare the selected date with the previous available date for each category
+    column_pairs = []
     for category in aging_categories:
         col_name = f"{selected_date}_{category}"
-        if col_name in df.columns:
-            comparison_values = df.apply(
-                lambda row: get_comparison_value(row, category),
-                axis=1
-            )
-            comparison_styles[col_name] = comparison_values.apply(
-                lambda x: color_changes(x, x)
-            )
-    
+        dates = sorted([c.split('_')[0] for c in df.columns if '_' in c and category in c], reverse=True)
+        if col_name in df.columns and selected_date in dates:
+            date_idx = dates.index(selected_date)
+            if date_idx < len(dates) - 1:
+                column_pairs.append((col_name, f"{dates[date_idx + 1]}_{category}"))
+    styles = column_pair_styles(df, column_pairs)
+
     # Apply styling
-    return df.style.apply(lambda _: comparison_styles, axis=None)\
+    return df.style.apply(lambda _: styles, axis=None)\
                   .format(lambda x: '{:.2f}'.format(x) if isinstance(x, (int, float)) and pd.notna(x) else '-')    
 
 def show_itss_dashboard():
-    df = load_itss_data()
-    if df is None:
+    entry = get_dataset_entry('itss_tender')
+    if entry is None:
         return
+    df = entry["df"]
     
     add_breadcrumb_navigation("ITSS", "ITSS SDR Analysis")
     
@@ -1632,32 +2514,28 @@ def show_itss_dashboard():
         # Summary metrics
         st.markdown("### Summary Metrics")
         
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            total_outstanding = current_data[aging_categories].sum().sum()
-            display_custom_metric("Total Outstanding", f"₹{total_outstanding:.2f} Lakhs")
-
-        with col2:
-            high_risk = current_data[['361-720', 'More than 2 Yr']].sum().sum()
-            high_risk_percentage = (high_risk / total_outstanding * 100) if total_outstanding != 0 else 0
-            display_custom_metric(
-                "High Risk Amount",
-                f"₹{high_risk:.2f} Lakhs",
+        total_outstanding = current_data[aging_categories].sum().sum()
+        high_risk = current_data[['361-720', 'More than 2 Yr']].sum().sum()
+        high_risk_percentage = (high_risk / total_outstanding * 100) if total_outstanding != 0 else 0
+        active_accounts = len(current_data[current_data[aging_categories].sum(axis=1) > 0])
+        display_metric_row([
+            dict(title="Total Outstanding", value=f"₹{total_outstanding:.2f} Lakhs"),
+            dict(
+                title="High Risk Amount",
+                value=f"₹{high_risk:.2f} Lakhs",
                 delta=f"{high_risk_percentage:.1f}%",
                 delta_type="inverse" if high_risk_percentage < 0 else "normal"
-            )
-        
-        with col3:
-            active_accounts = len(current_data[current_data[aging_categories].sum(axis=1) > 0])
-            display_custom_metric("Active Accounts", str(active_accounts))
+            ),
+            dict(title="Active Accounts", value=str(active_accounts))
+        ])
         
         # Main data display
         st.markdown("### Account-wise Aging Analysis")
         display_cols = ['Account Name'] + aging_categories
-        st.dataframe(
-            style_itss_data(current_data[display_cols], aging_categories),
-            height=400,
-            use_container_width=True
+        show_paginated_table(
+            current_data[display_cols],
+            lambda page: style_itss_data(page, aging_categories),
+            key="itss_accounts"
         )
         
         # Visualizations
@@ -1666,42 +2544,38 @@ def show_itss_dashboard():
         
         with col1:
             # Distribution pie chart
-            dist_data = current_data[aging_categories].sum()
-            fig_pie = px.pie(
-                values=dist_data.values,
-                names=dist_data.index,
-                title="Distribution by Aging Category"
-            )
+            def build_distribution_chart():
+                dist_data = current_data[aging_categories].sum()
+                return px.pie(
+                    values=dist_data.values,
+                    names=dist_data.index,
+                    title="Distribution by Aging Category"
+                )
+            fig_pie = cached_figure(entry, "ITSS SDR Analysis", "distribution", (selected_date,), build_distribution_chart)
             st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
             # Top accounts
             current_data['Total'] = current_data[aging_categories].sum(axis=1)
-            top_accounts = current_data.nlargest(5, 'Total')
-            fig_bar = px.bar(
-                top_accounts,
-                x='Account Name',
-                y='Total',
-                title="Top 5 Accounts by Outstanding"
+            fig_bar = cached_figure(
+                entry, "ITSS SDR Analysis", "top_accounts", (selected_date,),
+                lambda: px.bar(
+                    current_data.nlargest(5, 'Total'),
+                    x='Account Name',
+                    y='Total',
+                    title="Top 5 Accounts by Outstanding"
+                )
             )
             st.plotly_chart(fig_bar, use_container_width=True)
         
         # Export option
-        if st.sidebar.button("Export Analysis"):
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                current_data[display_cols].to_excel(
-                    writer, 
-                    sheet_name='ITSS Analysis',
-                    index=False
-                )
-            
-            st.sidebar.download_button(
-                label="📥 Download Report",
-                data=buffer.getvalue(),
-                file_name=f"itss_analysis_{selected_date.strftime('%Y-%m-%d')}.xlsx",
-                mime="application/vnd.ms-excel"
-            )
+        show_export_controls(
+            'itss_tender', "ITSS SDR Analysis", (selected_date,),
+            lambda: {'ITSS Analysis': current_data[display_cols]},
+            file_stem=f"itss_analysis_{selected_date.strftime('%Y-%m-%d')}",
+            label="Export Analysis",
+            download_label="📥 Download Report"
+        )
             
     except Exception as e:
         st.error(f"Error in ITSS analysis: {str(e)}")
@@ -1714,42 +2588,22 @@ def style_tsg_trend(df):
     - Green when amount decreases (improvement)
     - Red when amount increases (deterioration)
     """
-    def color_changes(row):
-        styles = [''] * len(df.columns)
-        
-        # Get date columns (exclude 'Ageing Category' and any other non-date columns)
-        date_cols = [col for col in df.columns if col != 'Ageing Category']
-        date_cols.sort(reverse=True)  # Most recent first
-        
-        for i in range(len(date_cols)-1):
-            current_col = date_cols[i]
-            next_col = date_cols[i+1]
-            current_val = row[current_col]
-            next_val = row[next_col]
-            
-            col_idx = df.columns.get_loc(current_col)
-            
-            try:
-                if pd.notna(current_val) and pd.notna(next_val):
-                    if current_val < next_val:  # Amount decreased (improved)
-                        styles[col_idx] = 'background-color: #92D050'  # Green
-                    elif current_val > next_val:  # Amount increased (deteriorated)
-                        styles[col_idx] = 'background-color: #FF7575'  # Red
-            except:
-                pass
-                
-        return styles
-    
+    # Get date columns (exclude 'Ageing Category' and any other non-date columns)
+    date_cols = [col for col in df.columns if col != 'Ageing Category']
+    date_cols.sort(reverse=True)  # Most recent first
+    styles = column_pair_styles(df, list(zip(date_cols, date_cols[1:])))
+
     # Format numbers and apply highlighting
-    styled = df.style.apply(color_changes, axis=1)
+    styled = df.style.apply(lambda _: styles, axis=None)
     
     # Format large numbers with commas and proper decimal places
     return styled.format(lambda x: '{:,.0f}'.format(x) if pd.notna(x) and isinstance(x, (int, float)) else x)
 
 def show_tsg_dashboard():
-    df = load_tsg_trend()
-    if df is None:
+    entry = get_dataset_entry('tsg_trend')
+    if entry is None:
         return
+    df = entry["df"]
     
     add_breadcrumb_navigation("TSG", "TSG Payment Receivables")
     
@@ -1781,57 +2635,49 @@ def show_tsg_dashboard():
 
         # Display the summary metrics with correct colors and arrows
         st.markdown("### Summary Metrics")
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            display_custom_metric(
-                f"Total Receivables (as of {date_cols[0]})",
-                f"₹{latest_total:,.0f}",
+        display_metric_row([
+            dict(
+                title=f"Total Receivables (as of {date_cols[0]})",
+                value=f"₹{latest_total:,.0f}",
                 delta=f"₹{total_change:,.0f}",
                 delta_type="inverse" if total_change < 0 else "normal"
-            )
-
-        with col2:
-            display_custom_metric(
-                "Week-on-Week Change",
-                f"{abs(week_change_pct):.2f}%",
+            ),
+            dict(
+                title="Week-on-Week Change",
+                value=f"{abs(week_change_pct):.2f}%",
                 delta=f"{week_change_pct:.2f}%",
                 delta_type="inverse" if week_change_pct < 0 else "normal"
-            )
-
-        with col3:
-            display_custom_metric(
-                "Month-to-Date Change",
-                f"{abs(month_change_pct):.2f}%",
+            ),
+            dict(
+                title="Month-to-Date Change",
+                value=f"{abs(month_change_pct):.2f}%",
                 delta=f"{month_change_pct:.2f}%",
                 delta_type="inverse" if month_change_pct < 0 else "normal"
             )
+        ])
 
         # Main trend table
         st.markdown("### Ageing-wise Trend Analysis")
-        styled_df = style_tsg_trend(df)
-        st.dataframe(styled_df, height=400, use_container_width=True)
+        show_paginated_table(df, style_tsg_trend, key="tsg_trend")
 
         # Trend Analysis
         st.markdown("### Trend Visualization")
 
-        # Prepare data for plotting
-        trend_data = df.melt(
-            id_vars=['Ageing Category'],
-            value_vars=date_cols,
-            var_name='Date',
-            value_name='Amount'
-        )
+        # Trend data in long format for plotting, built once per data version
+        trend_data = get_trend_long(entry)
 
         # Line chart
-        fig_line = px.line(
-            trend_data,
-            x='Date',
-            y='Amount',
-            color='Ageing Category',
-            title="Receivables Trend by Ageing Category"
-        )
-        fig_line.update_layout(yaxis_title="Amount (₹)")
+        def build_trend_chart():
+            fig_line = px.line(
+                trend_data,
+                x='Date',
+                y='Amount',
+                color='Ageing Category',
+                title="Receivables Trend by Ageing Category"
+            )
+            fig_line.update_layout(yaxis_title="Amount (₹)")
+            return fig_line
+        fig_line = cached_figure(entry, "TSG Payment Receivables", "trend", (), build_trend_chart)
         st.plotly_chart(fig_line, use_container_width=True)
 
         # Category Analysis
@@ -1840,53 +2686,57 @@ def show_tsg_dashboard():
 
         with col1:
             # Latest distribution pie chart
-            fig_pie = px.pie(
-                df,
-                values=date_cols[0],
-                names='Ageing Category',
-                title=f"Distribution as of {date_cols[0]}"
+            fig_pie = cached_figure(
+                entry, "TSG Payment Receivables", "distribution", (date_cols[0],),
+                lambda: px.pie(
+                    df,
+                    values=date_cols[0],
+                    names='Ageing Category',
+                    title=f"Distribution as of {date_cols[0]}"
+                )
             )
             st.plotly_chart(fig_pie)
 
         with col2:
             # Week-on-week changes by category
-            changes_df = pd.DataFrame({
-                'Category': df['Ageing Category'],
-                'Change': df[date_cols[0]] - df[date_cols[1]]
-            })
-            fig_changes = px.bar(
-                changes_df,
-                x='Category',
-                y='Change',
-                title="Week-on-Week Changes by Category",
-                color='Change',
-                color_continuous_scale=['green', 'yellow', 'red']
-            )
+            def build_changes_chart():
+                changes_df = pd.DataFrame({
+                    'Category': df['Ageing Category'],
+                    'Change': df[date_cols[0]] - df[date_cols[1]]
+                })
+                return px.bar(
+                    changes_df,
+                    x='Category',
+                    y='Change',
+                    title="Week-on-Week Changes by Category",
+                    color='Change',
+                    color_continuous_scale=['green', 'yellow', 'red']
+                )
+            fig_changes = cached_figure(entry, "TSG Payment Receivables", "changes", (date_cols[0], date_cols[1]), build_changes_chart)
             st.plotly_chart(fig_changes)
 
         # Export Option
-        if st.sidebar.button("Export TSG Analysis"):
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='TSG Trend', index=False)
-
-            st.sidebar.download_button(
-                label="📥 Download TSG Report",
-                data=buffer.getvalue(),
-                file_name=f"tsg_analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.ms-excel"
-            )
+        show_export_controls(
+            'tsg_trend', "TSG Payment Receivables", (),
+            lambda: {'TSG Trend': df},
+            file_stem=f"tsg_analysis_{datetime.now().strftime('%Y%m%d')}",
+            label="Export TSG Analysis",
+            download_label="📥 Download TSG Report"
+        )
 
     except Exception as e:
         st.error(f"Error in TSG analysis: {str(e)}")
         st.write("Error details:", str(e))
 
-@st.cache_data(ttl=300)
-def load_task_status_data():
+def load_task_status_data(revision=None):
+    """Load task status data, using the local snapshot when it is current."""
+    return load_with_snapshot('task_status', build_task_status_data, revision)
+
+def build_task_status_data(revision):
     """Load task status data."""
     try:
         # Fetch the data with validation skipped
-        df = load_data_from_drive(FILE_IDS['task_status'], skip_validation=True)
+        df = load_data_from_drive('task_status', revision, skip_validation=True)
         if df is None:
             return None
 
@@ -1912,302 +2762,860 @@ def load_task_status_data():
         st.error(f"Error loading task status data: {str(e)}")
         return None
 
-# Function to send pending tasks email
-def send_email_with_sendgrid(pending_tasks_df, recipient_email, recipient_name=""):
-    # Filter tasks based on status and completion date
-    pending_tasks_df = pending_tasks_df[
-        (pending_tasks_df['Status'] != 'Closed') &  # Exclude tasks marked as 'Closed'
-        ((pending_tasks_df['Completion Date'].isnull()) |  # Include tasks without a completion date
-         (pd.to_datetime(pending_tasks_df['Completion Date']) > pd.Timestamp.now()))  # Or tasks with future completion dates
-    ]
+# Task statuses in workflow order; their positions are the status codes used for counting
+TASK_STATUSES = ["Not Started", "In Progress", "Completed"]
 
-    if pending_tasks_df.empty:
-        return "You have no pending tasks."
-
-    # Filter tasks with and without due dates
-    tasks_with_due_date = pending_tasks_df[pending_tasks_df["Due Date"].notna()].sort_values(by="Due Date")
-    tasks_without_due_date = pending_tasks_df[pending_tasks_df["Due Date"].isna()]
-
-    # Email content generation
-    email_content = f"""
-    <html>
-    <body>
-        <p>Hello {recipient_name},</p>
-        <p>This is Harpinder Singh. Vandana Ma'am has assigned the following tasks to you. Let’s stay on track and ensure timely completion.</p>
-        <p><strong>Here’s what’s on your list:</strong></p>
-    """
-
-    # Add tasks with due dates
-    if not tasks_with_due_date.empty:
-        email_content += """
-        <h3 style="color: #2E86C1;">🗓️ Nearest Deadlines:</h3>
-        <table style="border-collapse: collapse; width: 100%; font-family: Arial, sans-serif; font-size: 14px;">
-            <thead>
-                <tr>
-                    <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">#</th>
-                    <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Task Description</th>
-                    <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Due Date</th>
-                    <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Comments</th>
-                </tr>
-            </thead>
-            <tbody>
-        """
-        for index, row in tasks_with_due_date.iterrows():
-            task = row.get("Task Description", "N/A")
-            due_date = row["Due Date"].strftime("%Y-%m-%d") if pd.notnull(row["Due Date"]) else "N/A"
-            comments = row.get("Comments", "No comments available")
-            email_content += f"""
-                <tr>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{index + 1}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{task}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{due_date}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{comments}</td>
-                </tr>
-            """
-        email_content += """
-            </tbody>
-        </table>
-        """
+# Label columns stored as categoricals when their values repeat
+DTYPE_CATEGORICAL_COLUMNS = ['Branch Name', 'Account Name', 'Ageing Category', 'Status', 'Assigned To']
 
-    # Add tasks without due dates
-    if not tasks_without_due_date.empty:
-        email_content += """
-        <h3 style="color: #C0392B;">❗ Target Dates Not Available:</h3>
-        <ul style="font-family: Arial, sans-serif; font-size: 14px;">
-        """
-        for index, row in tasks_without_due_date.iterrows():
-            task = row.get("Task Description", "N/A")
-            comments = row.get("Comments", "No comments available")
-            email_content += f"<li>{task} – {comments}</li>"
-        email_content += """
-        </ul>
-        """
+# Categories that must exist even before any row uses them (the task forms assign these)
+DTYPE_CATEGORY_VALUES = {
+    'Status': TASK_STATUSES
+}
+
+# Whole-number columns within this magnitude are stored as int32; sums still accumulate in int64
+# and differences of two values cannot overflow. Fractional amounts stay float64, because
+# float32 sums would lose paise.
+DTYPE_INT32_LIMIT = 2 ** 30
+
+def optimize_dtypes(df):
+    """Return a compact version of a loaded frame: repeated labels as categoricals, whole-number amounts as int32."""
+    df = df.copy(deep=False)
+    for col in df.columns:
+        values = df[col]
+        if col in DTYPE_CATEGORICAL_COLUMNS and values.dtype == object:
+            if col in DTYPE_CATEGORY_VALUES or values.nunique() <= len(values) // 2:
+                categories = list(DTYPE_CATEGORY_VALUES.get(col, []))
+                categories += sorted(set(values.dropna().unique()) - set(categories), key=str)
+                df[col] = pd.Categorical(values, categories=categories)
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values) and len(values):
+            numbers = values.to_numpy(dtype=float)
+            if (
+                not np.isnan(numbers).any()
+                and np.abs(numbers).max() < DTYPE_INT32_LIMIT
+                and (numbers == np.round(numbers)).all()
+            ):
+                df[col] = values.astype(np.int32)
+    return df
+
+# Loader for every FILE_IDS entry, called with the Drive revision to load (None looks it up)
+DATASET_LOADERS = {
+    'collections_data': load_collections_data,
+    'itss_tender': load_itss_data,
+    'sdr_trend': load_sdr_trend,
+    'tsg_trend': load_tsg_trend,
+    'task_status': load_task_status_data
+}
+
+# Display names used when reporting dataset freshness
+DATASET_LABELS = {
+    'collections_data': "Branch Reco",
+    'itss_tender': "ITSS Tender",
+    'sdr_trend': "CSD SDR Trend",
+    'tsg_trend': "TSG Receivables",
+    'task_status': "Task Status"
+}
+
+# Seconds between background revision checks of each dataset
+DATASET_REFRESH_INTERVALS = {
+    'collections_data': 300,
+    'itss_tender': 300,
+    'sdr_trend': 300,
+    'tsg_trend': 300,
+    'task_status': 120
+}
+
+# Seconds before a failed refresh is retried, doubling with each consecutive failure up to the refresh interval
+DATASET_RETRY_SECONDS = 30
+
+class DatasetStore:
+    """
+    Process-wide holder of the latest version of every dataset.
+
+    Sessions always get the version in memory, even after its refresh interval has
+    passed. A background thread revalidates each dataset on its own interval and swaps
+    in the new frame once it is ready. A failed refresh keeps the old frame and is
+    retried with backoff. The frames are shared, so callers must copy before
+    modifying them.
+    """
 
-    email_content += """
-        <p>Prioritize tasks with closer deadlines, and don’t hesitate to reach out if you need any clarification or support.</p>
-        <p>Keep up the great work!</p>
-        <p>Best regards,<br>Harpinder Singh</p>
-    </body>
-    </html>
+    def __init__(self, loaders, refresh_intervals, retry_seconds=DATASET_RETRY_SECONDS, tick_seconds=5):
+        self.loaders = loaders
+        self.refresh_intervals = refresh_intervals
+        self.retry_seconds = retry_seconds
+        self.tick_seconds = tick_seconds
+        self._entries = {}
+        self._locks = {dataset: threading.Lock() for dataset in loaders}
+        self._executor = ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix="dataset-load")
+        self._scheduler = threading.Thread(target=self._run_scheduler, name="dataset-refresh", daemon=True)
+        self._scheduler.start()
+
+    def get(self, dataset):
+        """Return the current frame of a dataset, loading it only if it was never loaded."""
+        entry = self.current(dataset)
+        return entry["df"] if entry else None
+
+    def current(self, dataset):
+        """Return the current entry of a dataset, loading it only if it was never loaded."""
+        return self._entries.get(dataset) or self.refresh(dataset)
+
+    def entry(self, dataset):
+        """Return the stored frame with its revision and refresh timestamps, if loaded."""
+        return self._entries.get(dataset)
+
+    def is_due(self, dataset):
+        entry = self._entries.get(dataset)
+        if entry is None:
+            return True
+        interval = self.refresh_intervals[dataset]
+        if entry["failures"]:
+            interval = min(self.retry_seconds * 2 ** (entry["failures"] - 1), interval)
+        return time.time() - entry["checked_at"] >= interval
+
+    def refresh(self, dataset):
+        """Load a dataset again if its Drive revision changed, keeping the old frame until then."""
+        with self._locks[dataset]:
+            # Another caller may have refreshed the dataset while we waited for the lock
+            if not self.is_due(dataset):
+                return self._entries[dataset]
+
+            entry = self._entries.get(dataset)
+            revision = get_dataset_revision(dataset)
+            now = time.time()
+            if entry is not None and revision is not None and revision == entry["revision"]:
+                entry = dict(entry, checked_at=now, failures=0)
+            else:
+                # The loader builds exactly the revision recorded on the entry
+                df = self.loaders[dataset](revision)
+                if df is None and revision is not None:
+                    # The load fails if the file changed during the download; try once more with the new revision
+                    latest = get_dataset_revision(dataset)
+                    if latest is not None and latest != revision:
+                        revision = latest
+                        df = self.loaders[dataset](revision)
+                if df is None:
+                    if entry is not None:
+                        # Keep serving the previous version and record the failed check, so it is retried with backoff
+                        self._entries[dataset] = entry = dict(entry, checked_at=now, failures=entry["failures"] + 1)
+                    return entry
+                loaded_bytes = df.memory_usage(deep=True).sum()
+                df = optimize_dtypes(df)
+                memory_bytes = df.memory_usage(deep=True).sum()
+                entry = {
+                    "dataset": dataset, "df": df, "revision": revision, "refreshed_at": now, "checked_at": now, "failures": 0, "derived": {},
+                    "memory_bytes": memory_bytes, "memory_saved": loaded_bytes - memory_bytes
+                }
+
+            self._entries[dataset] = entry
+            return entry
+
+    def prefetch(self):
+        """Load every dataset concurrently in the background."""
+        return {dataset: self._executor.submit(self.get, dataset) for dataset in self.loaders}
+
+    def _run_scheduler(self):
+        while True:
+            time.sleep(self.tick_seconds)
+            for dataset in self.loaders:
+                # Only datasets somebody has opened are kept fresh
+                if dataset in self._entries and self.is_due(dataset):
+                    try:
+                        self.refresh(dataset)
+                    except Exception:
+                        pass  # A failed refresh must not stop the scheduler
+
+@st.cache_resource
+def get_dataset_store():
+    """Create the process-wide dataset store and start its refresh scheduler."""
+    return DatasetStore(DATASET_LOADERS, DATASET_REFRESH_INTERVALS)
+
+def get_dataset_entry(dataset):
+    """
+    Return the latest loaded version of a FILE_IDS dataset as a store entry, or None.
+
+    Pages read the entry once per run and take the frame, its version and anything
+    derived from it from that one entry, so a background refresh during the run cannot
+    pair results of one version with the frame or cache key of another.
+    """
+    return get_dataset_store().current(dataset)
+
+def dataset_version(entry):
+    """Identifier of a loaded dataset version, for keying caches of results derived from it."""
+    # Without a Drive revision, fall back to the time the frame was loaded
+    return (entry["revision"] or entry["refreshed_at"]) if entry else None
+
+def get_dataset_version(dataset):
+    """Identifier of the loaded version of a dataset, for keying caches of results derived from it."""
+    return dataset_version(get_dataset_store().entry(dataset))
+
+def get_derived(entry, name, build):
+    """
+    Return a frame computed from a store entry's frame, building it once per loaded version.
+
+    Derived frames live on the store entry, so a new revision of the dataset drops
+    them together with the old frame. They are shared like the frames themselves.
     """
+    if entry is None:
+        return None
+    derived = entry["derived"]
+    if name not in derived:
+        derived[name] = build(entry["df"])
+    return derived[name]
+
+def get_trend_long(entry):
+    """Long-format version of an SDR or TSG trend dataset entry, shared by charts and exports."""
+    if entry is None:
+        return None
+    static_columns = TREND_STATIC_COLUMNS[entry["dataset"]]
+    return get_derived(entry, 'trend_long', lambda df: build_trend_long(df, static_columns))
+
+def prefetch_datasets():
+    """Download and parse every dataset in the background so each dashboard opens warm."""
+    return get_dataset_store().prefetch()
+
+def show_data_freshness():
+    """Show in the sidebar when each loaded dataset was last refreshed."""
+    store = get_dataset_store()
+    ist = pytz.timezone('Asia/Kolkata')
+    lines = []
+    for dataset, label in DATASET_LABELS.items():
+        entry = store.entry(dataset)
+        if entry:
+            refreshed = datetime.fromtimestamp(entry["refreshed_at"], ist).strftime('%d %b, %I:%M %p')
+            memory = f"{entry['memory_bytes'] / 1024 / 1024:,.1f} MB, {entry['memory_saved'] / 1024 / 1024:,.1f} MB saved"
+            lines.append(f"**{label}:** {refreshed} ({memory})")
+    if lines:
+        with st.sidebar.expander("Data Last Refreshed"):
+            st.markdown("  \n".join(lines))
+
+# Bulk reminder mailer: sending pace and retry policy
+MAILER_CONFIG = {
+    "max_workers": 4,
+    "max_retries": 3,
+    "retry_backoff_seconds": 2,
+    "max_per_second": 5
+}
+
+REMINDER_SUBJECT = "Pending Tasks Reminder"
+
+REMINDER_EMAIL_TEMPLATE = """
+<html>
+<body>
+    <p>Hello {{ recipient_name }},</p>
+    <p>This is Harpinder Singh. Vandana Ma'am has assigned the following tasks to you. Let’s stay on track and ensure timely completion.</p>
+    <p><strong>Here’s what’s on your list:</strong></p>
+    {% if tasks_with_due_date %}
+    <h3 style="color: #2E86C1;">🗓️ Nearest Deadlines:</h3>
+    <table style="border-collapse: collapse; width: 100%; font-family: Arial, sans-serif; font-size: 14px;">
+        <thead>
+            <tr>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">#</th>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Task Description</th>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Due Date</th>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Comments</th>
+            </tr>
+        </thead>
+        <tbody>
+        {% for description, due_date, comments in tasks_with_due_date %}
+            <tr>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ loop.index }}</td>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ description }}</td>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ due_date }}</td>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ comments }}</td>
+            </tr>
+        {% endfor %}
+        </tbody>
+    </table>
+    {% endif %}
+    {% if tasks_without_due_date %}
+    <h3 style="color: #C0392B;">❗ Target Dates Not Available:</h3>
+    <ul style="font-family: Arial, sans-serif; font-size: 14px;">
+    {% for description, comments in tasks_without_due_date %}
+        <li>{{ description }} – {{ comments }}</li>
+    {% endfor %}
+    </ul>
+    {% endif %}
+    <p>Prioritize tasks with closer deadlines, and don’t hesitate to reach out if you need any clarification or support.</p>
+    <p>Keep up the great work!</p>
+    <p>Best regards,<br>Harpinder Singh</p>
+</body>
+</html>
+"""
+
+# Compiled once at startup; task text is HTML-escaped when rendered
+REMINDER_TEMPLATE = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string(REMINDER_EMAIL_TEMPLATE)
+
+def overdue_task_mask(df, day):
+    """
+    Which tasks are overdue on a day: not completed and due on or before it.
 
-    # SendGrid API configuration
-    sendgrid_api_key = st.secrets["sendgrid"]["api_key"]
-    from_email = st.secrets["sendgrid"]["from_email"]
+    This is the Task Status dashboard's definition of Overdue; the overdue escalation
+    email uses it as well, so both report the same tasks.
+    """
+    day = pd.Timestamp(day).normalize()
+    return (df['Status'] != 'Completed') & (df['Due Date'] < day + pd.Timedelta(days=1))
+
+def pending_tasks(df, now=None):
+    """Tasks that are not completed or closed and have no completion date in the past."""
+    now = pd.Timestamp.now() if now is None else now
+    completion = pd.to_datetime(df['Completion Date'], errors='coerce')
+    return df[~df['Status'].isin(['Completed', 'Closed']) & (completion.isna() | (completion > now))]
+
+def render_reminder_email(tasks, recipient_name):
+    """
+    HTML reminder listing tasks by nearest due date, then tasks without one.
 
-    message = Mail(
-        from_email=from_email,
-        to_emails=recipient_email,
-        subject="Pending Tasks Reminder",
-        html_content=email_content,
+    Columns are formatted as whole arrays and the template renders both sections
+    in one pass over them.
+    """
+    # One stable sort puts dated tasks first by due date and undated tasks last
+    tasks = tasks.sort_values('Due Date', kind='stable', na_position='last')
+    n_due = int(tasks['Due Date'].notna().sum())
+    descriptions = tasks['Task Description'].astype(object).fillna("N/A").tolist()
+    due_dates = tasks['Due Date'].dt.strftime("%Y-%m-%d").tolist()
+    comments = tasks['Comments'].astype(object).fillna("No comments available").tolist()
+    return REMINDER_TEMPLATE.render(
+        recipient_name=recipient_name,
+        tasks_with_due_date=list(zip(descriptions[:n_due], due_dates[:n_due], comments[:n_due])),
+        tasks_without_due_date=list(zip(descriptions[n_due:], comments[n_due:]))
     )
 
+def build_reminder_emails(df, recipients, now=None):
+    """
+    One reminder per recipient address with pending tasks, from a single groupby.
+
+    `recipients` maps names to email addresses. Assignee names are matched to them
+    ignoring case and surrounding whitespace, and tasks are grouped by the resolved
+    address, so spellings like "Sujoy" and "sujoy " share one email.
+    """
+    recipients = {name.strip().lower(): email for name, email in recipients.items()}
+    pending = pending_tasks(df, now)
+    assignees = pending['Assigned To'].astype(object).where(pending['Assigned To'].notna(), "").astype(str).str.strip()
+    addresses = assignees.str.lower().map(recipients)
+    emails = []
+    for email, tasks in pending.groupby(addresses, sort=True):
+        # Greet with the spelling used on most of the tasks, the first one seen on a tie
+        name = assignees[addresses == email].value_counts().index[0]
+        emails.append({
+            "name": name,
+            "email": email,
+            "subject": REMINDER_SUBJECT,
+            "html": render_reminder_email(tasks, name),
+            "task_count": len(tasks)
+        })
+    return emails
+
+class SendGridTransport:
+    """Sends one email through the SendGrid API."""
+
+    def __init__(self, api_key, from_email):
+        self.client = SendGridAPIClient(api_key)
+        self.from_email = from_email
+
+    def send(self, email):
+        message = Mail(
+            from_email=self.from_email,
+            to_emails=email["email"],
+            subject=email["subject"],
+            html_content=email["html"]
+        )
+        response = self.client.send(message)
+        if response.status_code not in [200, 202]:
+            raise RuntimeError(f"SendGrid returned status code {response.status_code}")
+
+class StubTransport:
+    """Records emails instead of sending them, for local runs and tests. Fails the first `failures` sends."""
+
+    def __init__(self, failures=0):
+        self.sent = []
+        self.failures = failures
+        self._lock = threading.Lock()
+
+    def send(self, email):
+        with self._lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise RuntimeError("Stub transport failure")
+            self.sent.append(email)
+
+def get_mail_transport():
+    """Transport configured in secrets: SendGrid, or the stub when `transport = "stub"` is set."""
+    config = st.secrets["sendgrid"]
+    if config.get("transport") == "stub":
+        return StubTransport()
+    return SendGridTransport(config["api_key"], config["from_email"])
+
+class BulkMailer:
+    """Sends emails concurrently on a bounded worker pool, paced to a maximum rate and retried with backoff."""
+
+    def __init__(self, transport, max_workers, max_retries, retry_backoff_seconds, max_per_second):
+        self.transport = transport
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.min_interval = 1 / max_per_second
+        self._next_send = 0
+        self._lock = threading.Lock()
+
+    def _wait_for_slot(self):
+        # Sends are spaced min_interval apart across all workers
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_send)
+            self._next_send = slot + self.min_interval
+        time.sleep(max(slot - now, 0))
+
+    def _send(self, email):
+        result = {"name": email["name"], "email": email["email"], "task_count": email["task_count"], "attempts": 0, "error": None}
+        for attempt in range(1, self.max_retries + 1):
+            self._wait_for_slot()
+            result["attempts"] = attempt
+            try:
+                self.transport.send(email)
+                result["error"] = None
+                break
+            except Exception as e:
+                result["error"] = str(e)
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_backoff_seconds * 2 ** (attempt - 1))
+        result["sent"] = result["error"] is None
+        return result
+
+    def send_all(self, emails):
+        """Send every email and return one result per email, in the same order."""
+        if not emails:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(emails)), thread_name_prefix="mailer") as executor:
+            return list(executor.map(self._send, emails))
+
+def send_task_reminders(df, recipients, transport=None):
+    """Build and send reminders to the given recipients, returning the send results."""
+    emails = build_reminder_emails(df, recipients)
+    mailer = BulkMailer(transport or get_mail_transport(), **MAILER_CONFIG)
+    return mailer.send_all(emails)
+
+def show_reminder_results(results):
+    """Summarise a bulk send in the page."""
+    if not results:
+        st.info("No pending tasks to send.")
+        return
+    sent = [r for r in results if r["sent"]]
+    if sent:
+        st.success(f"📧 Sent {len(sent)} reminder email(s): " + ", ".join(f"{r['name']} ({r['task_count']} tasks)" for r in sent))
+    for r in results:
+        if not r["sent"]:
+            st.error(f"Failed to send email to {r['name']} after {r['attempts']} attempts: {r['error']}")
+
+ESCALATION_SUBJECT = "Overdue Tasks Escalation"
+
+ESCALATION_EMAIL_TEMPLATE = """
+<html>
+<body>
+    <p>Hello,</p>
+    <p>The following {{ task_count }} tasks are past their due date as of {{ as_of }}.</p>
+    <table style="border-collapse: collapse; width: 100%; font-family: Arial, sans-serif; font-size: 14px;">
+        <thead>
+            <tr>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Assigned To</th>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Task Description</th>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Due Date</th>
+                <th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">Days Overdue</th>
+            </tr>
+        </thead>
+        <tbody>
+        {% for assignee, description, due_date, days_overdue in tasks %}
+            <tr>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ assignee }}</td>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ description }}</td>
+                <td style="border: 1px solid #ddd; padding: 8px;">{{ due_date }}</td>
+                <td style="border: 1px solid #ddd; padding: 8px; color: #C0392B;">{{ days_overdue }}</td>
+            </tr>
+        {% endfor %}
+        </tbody>
+    </table>
+    <p>Best regards,<br>Harpinder Singh</p>
+</body>
+</html>
+"""
+
+ESCALATION_TEMPLATE = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string(ESCALATION_EMAIL_TEMPLATE)
+
+def build_escalation_email(df, recipient_email, now=None):
+    """Summary of every overdue task (see overdue_task_mask), most overdue first, or None if nothing is overdue."""
+    today = (pd.Timestamp.now() if now is None else now).normalize()
+    overdue = df[overdue_task_mask(df, today)].sort_values('Due Date', kind='stable')
+    if overdue.empty:
+        return None
+    days_overdue = (today - overdue['Due Date']).dt.days
+    return {
+        "name": "Escalation",
+        "email": recipient_email,
+        "subject": ESCALATION_SUBJECT,
+        "html": ESCALATION_TEMPLATE.render(
+            task_count=len(overdue),
+            as_of=today.strftime("%Y-%m-%d"),
+            tasks=list(zip(
+                overdue['Assigned To'].astype(object).fillna("Unassigned").tolist(),
+                overdue['Task Description'].astype(object).fillna("N/A").tolist(),
+                overdue['Due Date'].dt.strftime("%Y-%m-%d").tolist(),
+                days_overdue.tolist()
+            ))
+        ),
+        "task_count": len(overdue)
+    }
+
+# File queue and history shared with the standalone job runner (jobs.py)
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "jobs")
+JOB_QUEUE_DIR = os.path.join(JOB_DIR, "queue")
+JOB_HISTORY_PATH = os.path.join(JOB_DIR, "history.jsonl")
+JOB_HEARTBEAT_PATH = os.path.join(JOB_DIR, "heartbeat")
+
+# Seconds between queue polls of the runner, and after which a silent runner is considered stopped
+JOB_RUNNER_CONFIG = {
+    "poll_seconds": 5,
+    "heartbeat_timeout_seconds": 60
+}
+
+def enqueue_job(kind, params=None, source="dashboard"):
+    """Add a job to the runner's queue and return its id."""
+    os.makedirs(JOB_QUEUE_DIR, exist_ok=True)
+    enqueued_at = time.time()
+    # Nanosecond prefix keeps the queue in order; the random suffix keeps ids unique
+    job_id = f"{time.time_ns()}-{os.urandom(4).hex()}"
+    job = {"id": job_id, "kind": kind, "params": params or {}, "source": source, "enqueued_at": enqueued_at}
+    # Written under a temporary name so the runner never picks up a partial file
+    path = os.path.join(JOB_QUEUE_DIR, f"{job_id}.json")
+    with open(path + ".tmp", "w") as job_file:
+        json.dump(job, job_file)
+    os.replace(path + ".tmp", path)
+    return job_id
+
+def job_runner_alive():
+    """Whether a job runner has polled the queue recently."""
     try:
-        sg = SendGridAPIClient(sendgrid_api_key)
-        response = sg.send(message)
-        if response.status_code in [200, 202]:
-            st.success("📧 Email sent successfully!")
-            return "Email sent successfully!"
-        else:
-            st.error(f"Failed to send email. Status code: {response.status_code}")
-            return "Error: Email sending failed."
-    except Exception as e:
-        st.error(f"Error sending email: {str(e)}")
-        return "Error: Email sending failed."
+        return time.time() - os.path.getmtime(JOB_HEARTBEAT_PATH) < JOB_RUNNER_CONFIG["heartbeat_timeout_seconds"]
+    except OSError:
+        return False
+
+def read_job_history(limit=20):
+    """Most recent job runs recorded by the runner, newest first."""
+    try:
+        with open(JOB_HISTORY_PATH) as history_file:
+            lines = history_file.readlines()[-limit:]
+    except OSError:
+        return []
+    history = []
+    for line in reversed(lines):
+        try:
+            history.append(json.loads(line))
+        except ValueError:
+            # A line cut short by a crash mid-write is skipped
+            continue
+    return history
+
+def request_task_reminders(df, recipients, label):
+    """Queue reminders for the job runner when one is running, otherwise send them in this run."""
+    if job_runner_alive():
+        enqueue_job("task_reminders", {"recipients": sorted(recipients)})
+        st.success(f"📬 Reminders to {label} queued; the job runner will send them shortly.")
+        return
+    with st.spinner(f"Sending reminders to {label}..."):
+        show_reminder_results(send_task_reminders(df, recipients))
+
+def show_job_history():
+    """Recent job runs in an expander, if the runner has recorded any."""
+    history = read_job_history()
+    if not history:
+        return
+    ist = pytz.timezone('Asia/Kolkata')
+    with st.expander("Recent Jobs"):
+        st.dataframe(pd.DataFrame([{
+            "Job": job["kind"],
+            "Source": job.get("source"),
+            "Started": datetime.fromtimestamp(job["started_at"], ist).strftime('%d %b, %I:%M %p'),
+            "Seconds": round(job["duration_seconds"], 1),
+            "Outcome": job["outcome"],
+            "Details": job.get("error") or job.get("summary")
+        } for job in history]), use_container_width=True)
+
+def classify_task_cards(df, now=None):
+    """Card class of every task: completed, overdue (past due) or due-soon (due within 3 days)."""
+    now = pd.Timestamp.now() if now is None else now
+    time_left = df["Due Date"] - now
+    is_completed = df["Status"] == "Completed"
+    classes = np.select(
+        [is_completed, time_left < pd.Timedelta(0), time_left < pd.Timedelta(days=3)],
+        ["task-card completed", "task-card overdue", "task-card due-soon"],
+        default="task-card"
+    )
+    return pd.Series(classes, index=df.index)
+
+def format_task_field(values, date_format=None):
+    """
+    Escape a column of task fields for HTML, showing missing values as N/A.
+
+    Line breaks become <br>: a blank line inside the card markup would end the HTML
+    block and show the rest of the card as markdown.
+    """
+    if date_format:
+        values = values.dt.strftime(date_format)
+    escaped = values.astype(object).where(values.notna(), "N/A").astype(str).map(html.escape)
+    return escaped.str.replace(r"\r\n|\r|\n", "<br>", regex=True)
 
 def show_task_cards(df_page):
-    # Define CSS for the glass/blur material design cards with expanders
-    cards_per_row = 3
-    rows_needed = (len(df_page) + cards_per_row - 1) // cards_per_row
-    st.markdown("""
-    <style>
-    .task-card-container {
-        position: relative;
-        margin-bottom: 20px;
-    }
-    .task-card {
-        background: rgba(255, 255, 255, 0.25);
-        backdrop-filter: blur(8px);
-        -webkit-backdrop-filter: blur(8px);
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        transition: all 0.3s ease;
-        overflow: hidden;
-        position: relative;
-    }
-    .task-card:hover {
-        box-shadow: 0 4px 15px rgba(0,0,0,0.15);
-        transform: translateY(-5px);
-    }
-    .task-title {
-        font-size: 1.2em;
-        font-weight: bold;
-        color: #3f51b5;
-        position: relative;
-        margin-bottom: 10px;
-    }
-    .task-title::after {
-        content: "";
-        display: block;
-        width: 40px;
-        height: 3px;
-        background: #3f51b5;
-        margin-top: 5px;
-        border-radius: 2px;
-    }
-    .task-quickinfo {
-        font-size: 0.9em;
-        color: #333;
-        margin-bottom: 5px;
-    }
-    .expander-hint {
-        position: absolute;
-        bottom: 10px;
-        right: 15px;
-        font-size: 0.8em;
-        color: #555;
-        opacity: 0;
-        transition: opacity 0.3s ease;
-    }
-    .task-card:hover .expander-hint {
-        opacity: 1;
+    """Show a page of tasks as a grid of cards, rendered as one HTML element with native expand/collapse."""
+    inject_styles("task_cards")
+    if df_page.empty:
+        return
+
+    card_classes = classify_task_cards(df_page)
+    descriptions = format_task_field(df_page["Task Description"])
+    statuses = format_task_field(df_page["Status"])
+    due_dates = format_task_field(df_page["Due Date"], '%Y-%m-%d').replace("N/A", "None")
+    assignees = format_task_field(df_page["Assigned To"])
+    assigned_on = format_task_field(df_page["Assigned on"], '%Y-%m-%d')
+    comments = format_task_field(df_page["Comments"])
+
+    # Each card is a single line, so nothing inside it can end the markdown HTML block
+    cards = [
+        f'<div class="task-card-container"><div class="{card_class}">'
+        f'<div class="task-title">{description}</div>'
+        f'<div class="task-quickinfo"><strong>Status:</strong> {status}</div>'
+        f'<div class="task-quickinfo"><strong>Due Date:</strong> {due_date}</div>'
+        '<details class="task-details"><summary>Show more details</summary>'
+        f'<div class="task-quickinfo"><strong>Assigned To:</strong> {assignee}</div>'
+        f'<div class="task-quickinfo"><strong>Assigned On:</strong> {assigned}</div>'
+        f'<div class="task-quickinfo"><strong>Comments:</strong> {comment}</div>'
+        '</details>'
+        '</div></div>'
+        for card_class, description, status, due_date, assignee, assigned, comment in zip(
+            card_classes, descriptions, statuses, due_dates, assignees, assigned_on, comments
+        )
+    ]
+    st.markdown(f'<div class="task-grid">{"".join(cards)}</div>', unsafe_allow_html=True)
+
+# Relative weight of a match by field and by how the query term matched a word
+SEARCH_FIELD_WEIGHTS = {"Task Description": 2.0, "Comments": 1.0}
+SEARCH_MATCH_WEIGHTS = {"exact": 3.0, "prefix": 2.0, "substring": 1.0, "fuzzy": 0.5}
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+class TaskSearchIndex:
+    """
+    In-memory inverted index over the words of several text columns.
+
+    Every query term must match a word of the task, exactly, as a prefix, inside it
+    (through a trigram index of the vocabulary) or, when none of those match, as a
+    close spelling. Tasks are ranked by the summed field and match weights.
+    """
+
+    def __init__(self, df, fields=SEARCH_FIELD_WEIGHTS):
+        self.n_docs = len(df)
+        self.fields = fields
+        self.postings = {}
+        for field in fields:
+            words = defaultdict(list)
+            for position, text in enumerate(df[field].tolist()):
+                if isinstance(text, str):
+                    for word in set(SEARCH_TOKEN_PATTERN.findall(text.lower())):
+                        words[word].append(position)
+            self.postings[field] = {word: np.array(positions, dtype=np.int32) for word, positions in words.items()}
+
+        self.vocabulary = sorted(set().union(*(postings.keys() for postings in self.postings.values())))
+        self.trigrams = defaultdict(set)
+        for word in self.vocabulary:
+            for i in range(len(word) - 2):
+                self.trigrams[word[i:i + 3]].add(word)
+
+    def _matching_words(self, term):
+        """Vocabulary words matching a query term, with the weight of the kind of match."""
+        matches = {}
+        # Prefix matches are one contiguous range of the sorted vocabulary
+        start = bisect_left(self.vocabulary, term)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(term):
+                break
+            matches[word] = SEARCH_MATCH_WEIGHTS["exact" if word == term else "prefix"]
+
+        if len(term) < 3:
+            return matches
+
+        term_trigrams = [term[i:i + 3] for i in range(len(term) - 2)]
+        candidates = set.intersection(*(self.trigrams.get(trigram, set()) for trigram in term_trigrams))
+        for word in candidates:
+            if word not in matches and term in word:
+                matches[word] = SEARCH_MATCH_WEIGHTS["substring"]
+
+        if not matches:
+            # Only words sharing a trigram with the term can be close spellings
+            similar = set().union(*(self.trigrams.get(trigram, set()) for trigram in term_trigrams))
+            for word in get_close_matches(term, similar, n=5, cutoff=0.75):
+                matches[word] = SEARCH_MATCH_WEIGHTS["fuzzy"]
+        return matches
+
+    def search(self, query):
+        """Positions of the tasks matching every term of the query, best matches first."""
+        terms = SEARCH_TOKEN_PATTERN.findall(query.lower())
+        if not terms:
+            return np.arange(self.n_docs)
+
+        total = np.zeros(self.n_docs)
+        matched = np.ones(self.n_docs, dtype=bool)
+        for term in terms:
+            # Gather the postings of every matching word by weight, then score each group at once
+            groups = defaultdict(list)
+            for word, match_weight in self._matching_words(term).items():
+                for field, field_weight in self.fields.items():
+                    positions = self.postings[field].get(word)
+                    if positions is not None:
+                        groups[match_weight * field_weight].append(positions)
+
+            term_scores = np.zeros(self.n_docs)
+            for weight, postings in groups.items():
+                positions = np.concatenate(postings)
+                term_scores[positions] = np.maximum(term_scores[positions], weight)
+            matched &= term_scores > 0
+            total += term_scores
+
+        positions = np.flatnonzero(matched)
+        # Highest score first, ties in task order
+        return positions[np.argsort(-total[positions], kind="stable")]
+
+def get_task_search_index(entry):
+    """Search index over task descriptions and comments, built once per data version."""
+    return get_derived(entry, 'search_index', TaskSearchIndex)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def filter_task_index(_df, _search_index, version, status, assignee, query, sort_column, ascending):
+    """
+    Positions of the tasks matching the filters, in display order.
+
+    Search results keep their ranking unless a sort column is chosen. The frame is
+    identified by its data version instead of being hashed, so paging through the
+    result only slices the cached positions.
+    """
+    mask = np.ones(len(_df), dtype=bool)
+    if status != "All":
+        mask &= (_df["Status"] == status).to_numpy()
+    if assignee != "All":
+        mask &= (_df["Assigned To"] == assignee).to_numpy()
+
+    if query:
+        ranked = _search_index.search(query)
+        positions = ranked[mask[ranked]]
+    else:
+        positions = np.flatnonzero(mask)
+    if sort_column != "None":
+        order = _df[sort_column].iloc[positions].reset_index(drop=True).sort_values(ascending=ascending, kind="stable").index
+        positions = positions[order]
+    return positions
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def compute_task_metrics(_df, version, reference_date):
+    """
+    Every Task Status KPI in one pass over the frame, for the given day.
+
+    Due dates are whole days, so a task is overdue from its due date onwards
+    (overdue_task_mask) and due soon within the three days after that.
+    Yesterday's overdue count (due before reference_date) gives the day-over-day delta.
+    """
+    day = pd.Timedelta(days=1)
+    status_codes = pd.Categorical(_df["Status"], categories=TASK_STATUSES).codes
+    is_open = status_codes != TASK_STATUSES.index("Completed")
+    due = _df["Due Date"].to_numpy(dtype="datetime64[ns]")
+
+    flags = {
+        "Completed": ~is_open,
+        "Overdue": overdue_task_mask(_df, reference_date).to_numpy(),
+        "Due Soon": is_open & (due >= np.datetime64(reference_date + day)) & (due < np.datetime64(reference_date + 4 * day)),
+        "Overdue Yesterday": overdue_task_mask(_df, reference_date - day).to_numpy()
     }
-    .overdue {border-left: 4px solid #F44336; padding-left: 16px;}
-    .due-soon {border-left: 4px solid #FFC107; padding-left: 16px;}
-    .completed {border-left: 4px solid #4CAF50; padding-left: 16px;}
-    </style>
-    """, unsafe_allow_html=True)
 
-    for row_idx in range(rows_needed):
-        cols = st.columns(cards_per_row)
-        for col_idx in range(cards_per_row):
-            task_index = row_idx * cards_per_row + col_idx
-            if task_index < len(df_page):
-                row = df_page.iloc[task_index]
-
-                # Determine card class based on status and due date
-                card_class = "task-card"
-                due_date = row.get("Due Date", None)
-                status = row.get("Status", "Not Started")
-                is_completed = (status == "Completed")
-                is_overdue = False
-                is_due_soon = False
-
-                if not is_completed and pd.notnull(due_date):
-                    days_left = (due_date - pd.Timestamp.now()).days
-                    if days_left < 0:
-                        is_overdue = True
-                    elif days_left <= 2:
-                        is_due_soon = True
-
-                if is_completed:
-                    card_class += " completed"
-                elif is_overdue:
-                    card_class += " overdue"
-                elif is_due_soon:
-                    card_class += " due-soon"
-
-                assigned_to = row.get("Assigned To", "N/A")
-                assigned_on = row.get("Assigned on", "N/A")
-                comments = row.get("Comments", "N/A")
-                if pd.isna(assigned_on):
-                    assigned_on = "N/A"
-                if pd.isna(comments):
-                    comments = "N/A"
-                due_date_str = due_date.strftime('%Y-%m-%d') if pd.notnull(due_date) else "None"
-
-                with cols[col_idx]:
-                    # Create the card HTML
-                    # Basic visible info: Title, Status, Due Date
-                    # More details inside an expander
-                    st.markdown(f"""
-                    <div class="task-card-container">
-                        <div class="{card_class}">
-                            <div class="task-title">{row['Task Description']}</div>
-                            <div class="task-quickinfo"><strong>Status:</strong> {status}</div>
-                            <div class="task-quickinfo"><strong>Due Date:</strong> {due_date_str}</div>
-                            <div class="expander-hint">Hover & Expand for more</div>
-                    """, unsafe_allow_html=True)
-
-                    # Using Streamlit expander for additional info
-                    with st.expander("Show more details", expanded=False):
-                        st.write(f"**Assigned To:** {assigned_to}")
-                        st.write(f"**Assigned On:** {assigned_on}")
-                        st.write(f"**Comments:** {comments}")
-
-                    # Close the div
-                    st.markdown("</div></div>", unsafe_allow_html=True)
+    assignee_codes, assignees = pd.factorize(_df["Assigned To"].astype(object).fillna("Unassigned"))
+    by_assignee = pd.DataFrame(
+        {
+            "Total": np.bincount(assignee_codes, minlength=len(assignees)),
+            **{
+                name: np.bincount(assignee_codes, weights=flag, minlength=len(assignees)).astype(int)
+                for name, flag in flags.items() if name != "Overdue Yesterday"
+            }
+        },
+        index=pd.Index(assignees, name="Assigned To")
+    ).sort_values("Total", ascending=False)
+
+    status_counts = np.bincount(status_codes[status_codes >= 0], minlength=len(TASK_STATUSES))
+    totals = {name: int(flag.sum()) for name, flag in flags.items()}
+    return {
+        "total": len(_df),
+        "by_status": dict(zip(TASK_STATUSES, status_counts.tolist())),
+        "completed": totals["Completed"],
+        "overdue": totals["Overdue"],
+        "overdue_delta": totals["Overdue"] - totals["Overdue Yesterday"],
+        "due_soon": totals["Due Soon"],
+        "by_assignee": by_assignee
+    }
 
 def show_task_status_dashboard():
-    df = load_task_status_data()
-    if df is None:
+    entry = get_dataset_entry('task_status')
+    if entry is None:
         return
+    df = entry["df"]
 
     st.title("Task Status Dashboard")
 
     # Filters
     st.sidebar.header("Filters")
-    status_filter = st.sidebar.selectbox("Filter by Status", options=["All", "Not Started", "In Progress", "Completed"])
+    status_filter = st.sidebar.selectbox("Filter by Status", options=["All"] + TASK_STATUSES)
     assigned_to_options = ["All"] + sorted(df["Assigned To"].dropna().unique().tolist())
     assigned_filter = st.sidebar.selectbox("Filter by Assigned To", options=assigned_to_options)
-    search_query = st.sidebar.text_input("Search by Task Description (partial match)")
-
-    filtered_df = df.copy()
-    if status_filter != "All":
-        filtered_df = filtered_df[filtered_df["Status"] == status_filter]
-    if assigned_filter != "All":
-        filtered_df = filtered_df[filtered_df["Assigned To"] == assigned_filter]
-    if search_query:
-        mask = filtered_df["Task Description"].str.contains(search_query, case=False, na=False)
-        filtered_df = filtered_df[mask]
+    search_query = st.sidebar.text_input("Search Tasks (description and comments)")
 
     # Sorting
     st.sidebar.header("Sorting")
-    sort_column = st.sidebar.selectbox("Sort By", options=["None"] + list(filtered_df.columns))
+    sort_column = st.sidebar.selectbox("Sort By", options=["None"] + list(df.columns))
     sort_order = st.sidebar.radio("Order", options=["Ascending", "Descending"], index=0)
-    if sort_column != "None":
-        ascending = (sort_order == "Ascending")
-        filtered_df = filtered_df.sort_values(by=sort_column, ascending=ascending)
+
+    # Filtered and sorted positions are cached per data version and filter state
+    task_index = filter_task_index(
+        df, get_task_search_index(entry), dataset_version(entry),
+        status_filter, assigned_filter, search_query, sort_column, sort_order == "Ascending"
+    )
 
     # Pagination
     st.sidebar.header("Pagination")
     page_size = st.sidebar.number_input("Tasks per page", min_value=5, max_value=50, value=10)
-    total_tasks = len(filtered_df)
+    total_tasks = len(task_index)
     max_pages = max((total_tasks - 1) // page_size + 1, 1)
     page_num = st.sidebar.number_input("Page Number", min_value=1, max_value=max_pages, value=1)
     start_idx = (page_num - 1) * page_size
     end_idx = start_idx + page_size
-    df_page = filtered_df.iloc[start_idx:end_idx]
+    df_page = df.iloc[task_index[start_idx:end_idx]]
+
+    # Metrics, computed once per data version and day
+    metrics = compute_task_metrics(df, dataset_version(entry), pd.Timestamp.now().normalize())
 
-    # Metrics
-    total_tasks_all = len(df)
-    completed_tasks = len(df[df["Status"] == "Completed"])
-    overdue_tasks = len(df[(df["Status"] != "Completed") & (df["Due Date"] < pd.Timestamp.now())])
+    col_a, col_b, col_c, col_d = st.columns(4)
+    col_a.metric("Total Tasks", metrics["total"])
+    col_b.metric("Completed Tasks", metrics["completed"])
+    col_c.metric("Overdue Tasks", metrics["overdue"], f"{metrics['overdue_delta']:+}")
+    col_d.metric("Due Soon", metrics["due_soon"])
 
-    col_a, col_b, col_c = st.columns(3)
-    col_a.metric("Total Tasks", total_tasks_all)
-    col_b.metric("Completed Tasks", completed_tasks)
-    overdue_delta = overdue_tasks - len(df[(df["Status"] != "Completed") & (df["Due Date"] < (pd.Timestamp.now() - pd.Timedelta(days=1)))])
-    col_c.metric("Overdue Tasks", overdue_tasks, f"{overdue_delta:+}")
+    with st.expander("Tasks by Assignee"):
+        st.dataframe(metrics["by_assignee"], use_container_width=True)
 
     # Admin-only actions
     if 'username' in st.session_state and st.session_state.username == "admin":
         st.markdown("### Admin Actions")
     
-        # Example: Send mail to "Sujoy"
-        pending_tasks_sujoy = df[(df["Assigned To"] == "Sujoy") & (df["Status"] != "Completed")]
-        if st.button("Send Pending Tasks Email to Sujoy"):
-            recipient_email = st.secrets["emails"]["sujoy"]
-            result = send_email_with_sendgrid(pending_tasks_sujoy, recipient_email, recipient_name="Sujoy")
-            st.info(result)
+        # One reminder per recipient configured in secrets, sent concurrently or by the job runner
+        recipients = dict(st.secrets.get("emails", {}))
+        if st.button("Send Pending Tasks Email to Everyone"):
+            request_task_reminders(df, recipients, "everyone")
 
-        if st.button("Send Pending Tasks Email to Mehboob"):
-            recipient_email = st.secrets["emails"]["mehboob"]
-            result = send_email_with_sendgrid(pending_tasks_mehboob, recipient_email, recipient_name="Mehboob")
-            st.info(result)
+        for name, email in recipients.items():
+            if st.button(f"Send Pending Tasks Email to {name.title()}", key=f"remind_{name}"):
+                request_task_reminders(df, {name: email}, name.title())
 
+        show_job_history()
 
     # Add/Update tasks (same as your code)
     if "show_form" not in st.session_state:
@@ -2283,10 +3691,12 @@ def show_task_status_dashboard():
                     if submitted_update:
                         if updated_status == "Completed" and pd.isna(updated_completion_date):
                             updated_completion_date = pd.Timestamp.now().date()
-                        df.loc[df["Task Description"] == task_to_update, "Status"] = updated_status
-                        df.loc[df["Task Description"] == task_to_update, "Completion Date"] = updated_completion_date if updated_status == "Completed" else None
-                        df.loc[df["Task Description"] == task_to_update, "Comments"] = update_comments
-                        save_to_google_sheet(df)
+                        # The loaded frame is shared between sessions, so update a copy
+                        updated_df = df.copy()
+                        updated_df.loc[updated_df["Task Description"] == task_to_update, "Status"] = updated_status
+                        updated_df.loc[updated_df["Task Description"] == task_to_update, "Completion Date"] = updated_completion_date if updated_status == "Completed" else None
+                        updated_df.loc[updated_df["Task Description"] == task_to_update, "Comments"] = update_comments
+                        save_to_google_sheet(updated_df)
                         st.success("Task updated successfully!")
                         st.experimental_rerun()
 
@@ -2415,6 +3825,9 @@ def get_custom_greeting():
 
 # In the main function, show greeting at the top:
 def main():
+    # Style elements only last for one run, so every run injects its stylesheets again
+    st.session_state['injected_styles'] = set()
+
     if not check_password():
         return
 
@@ -2431,89 +3844,8 @@ def main():
             st.session_state['start_clicked'] = False
 
         # Updated CSS for the welcome screen cards to match glass/blur effect
+        inject_styles("welcome")
         st.markdown(f"""
-        <style>
-            @keyframes gradientBackground {{
-                0% {{ background-position: 0% 50%; }}
-                50% {{ background-position: 100% 50%; }}
-                100% {{ background-position: 0% 50%; }}
-            }}
-            .cinematic-container {{
-                padding: 50px 20px;
-                text-align: center;
-                background: linear-gradient(270deg, #ff416c, #ff4b2b, #ff9a00, #ffd700, #007bff, #0056b3);
-                background-size: 800% 800%;
-                animation: gradientBackground 10s ease infinite;
-                border-radius: 20px;
-                box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
-                margin-bottom: 30px;
-            }}
-            .cinematic-title {{
-                font-size: 3em;
-                font-weight: bold;
-                color: #ffffff !important;
-                text-shadow: 0 0 30px rgba(0, 0, 0, 0.6);
-                opacity: 0;
-                animation: fadeIn 2.5s ease-in-out forwards;
-            }}
-            @keyframes fadeIn {{
-                0% {{ opacity: 0; transform: translateY(20px); }}
-                100% {{ opacity: 1; transform: translateY(0); }}
-            }}
-            .fade-out {{
-                animation: fadeOut 2s ease-in-out forwards;
-            }}
-            @keyframes fadeOut {{
-                0% {{ opacity: 1; }}
-                100% {{ opacity: 0; }}
-            }}
-            .get-started-button {{
-                background: linear-gradient(45deg, #007bff, #00c6ff);
-                color: #ffffff;
-                padding: 15px 30px;
-                font-size: 1.5em;
-                font-weight: bold;
-                border: none;
-                border-radius: 50px;
-                cursor: pointer;
-                box-shadow: 0px 6px 15px rgba(0, 0, 0, 0.2);
-                transition: transform 0.3s, box-shadow 0.3s;
-            }}
-            .get-started-button:hover {{
-                transform: translateY(-5px);
-                box-shadow: 0px 12px 25px rgba(0, 0, 0, 0.3);
-            }}
-
-            /* Updated card styling for glass/blur effect */
-            .card {{
-                margin: 20px auto;
-                max-width: 1200px;
-                padding: 20px;
-                font-size: 1.2em;
-                color: #333;
-                text-align: left;
-                line-height: 1.6;
-                background: rgba(255, 255, 255, 0.25);
-                backdrop-filter: blur(8px);
-                -webkit-backdrop-filter: blur(8px);
-                border-radius: 15px;
-                box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-                opacity: 0;
-                animation: fadeInStep 2s ease-in-out forwards;
-                transition: all 0.3s ease;
-            }}
-
-            .card:hover {{
-                box-shadow: 0 8px 30px rgba(0,0,0,0.25);
-                transform: translateY(-5px);
-            }}
-
-            @keyframes fadeInStep {{
-                0% {{ opacity: 0; transform: translateY(20px); }}
-                100% {{ opacity: 1; transform: translateY(0); }}
-            }}
-        </style>
-
         <div class="cinematic-container">
             <div class="cinematic-title">{greeting_text}</div>
         </div>
@@ -2527,28 +3859,24 @@ def main():
 
         # Show the instructions after the button click, one by one
         if st.session_state['start_clicked']:
-            # Delay to create step-by-step feel
-            with st.spinner("Loading steps..."):
-                time.sleep(0.5)
-                st.markdown("""
-                <div class="card">
-                    ✨ <strong>To get started</strong>, please choose a department from the <strong>Select Department</strong> dropdown on the left.
-                </div>
-                """, unsafe_allow_html=True)
+            # Staggered animation delays create the step-by-step feel in the browser
+            st.markdown("""
+            <div class="card" style="animation-delay: 0.5s;">
+                ✨ <strong>To get started</strong>, please choose a department from the <strong>Select Department</strong> dropdown on the left.
+            </div>
+            """, unsafe_allow_html=True)
 
-                time.sleep(1)
-                st.markdown("""
-                <div class="card">
-                    📊 After that, <strong>pick the report</strong> you'd like to explore.
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("""
+            <div class="card" style="animation-delay: 1.5s;">
+                📊 After that, <strong>pick the report</strong> you'd like to explore.
+            </div>
+            """, unsafe_allow_html=True)
 
-                time.sleep(1)
-                st.markdown("""
-                <div class="card" style="text-align: center;">
-                    🗂️ Harpinder has hosted several insightful reports available to help you make informed decisions. 😊
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("""
+            <div class="card" style="text-align: center; animation-delay: 2.5s;">
+                🗂️ Harpinder has hosted several insightful reports available to help you make informed decisions. 😊
+            </div>
+            """, unsafe_allow_html=True)
 
     else:
         # Display the selected report if both department and report are chosen
@@ -2556,11 +3884,28 @@ def main():
 
     st.sidebar.markdown("---")
     st.sidebar.subheader("General Options")
+    show_data_freshness()
     if st.sidebar.button("Logout"):
         st.session_state.clear()
         st.rerun()
         st.sidebar.info("Logged out successfully!")
 
+    # Drive download counters for troubleshooting slow loads
+    engine = get_drive_engine()
+    if engine and st.session_state.get('username') == "admin":
+        with st.sidebar.expander("Drive Download Stats"):
+            stats = dict(engine.stats)
+            avg_latency = stats["seconds"] / stats["downloads"] if stats["downloads"] else 0
+            st.write(f"**Downloads:** {stats['downloads']} ({stats['bytes'] / 1024 / 1024:,.1f} MB)")
+            st.write(f"**Average latency:** {avg_latency:.2f}s")
+            st.write(f"**Local cache hits:** {stats['cache_hits']}")
+            st.write(f"**Shared in-flight requests:** {stats['shared_requests']}")
+            st.write(f"**Retries / failures:** {stats['retries']} / {stats['failures']}")
+            figure_cache = get_figure_cache()
+            figure_stats = dict(figure_cache.stats)
+            st.write(f"**Cached figures:** {len(figure_cache)} ({figure_stats['bytes'] / 1024 / 1024:,.1f} MB), "
+                     f"{figure_stats['hits']} hits / {figure_stats['misses']} misses")
+
     # Footer Branding in Sidebar
     st.sidebar.markdown(
         """
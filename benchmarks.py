@@ -0,0 +1,288 @@
+"""
+Benchmarks for the dashboard's data pipeline.
+
+The app module is imported directly, so run this from the project root with the
+same Streamlit secrets the app uses (.streamlit/secrets.toml):
+
+    python benchmarks.py                  # run every benchmark
+    python benchmarks.py excel_readers    # run a single benchmark
+"""
+import io
+import multiprocessing
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+import app
+
+
+def peak_rss_mb():
+    """Peak resident memory of the current process in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def make_collections_workbook(n_branches, n_dates):
+    """Long-format Branch Reco workbook: one row per branch and date."""
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True})
+    sheet = workbook.add_worksheet()
+    date_format = workbook.add_format({"num_format": "dd-mm-yyyy"})
+    sheet.write_row(0, 0, ["Branch Name", "Date", "Balance As On", "Pending Amount", "Reduced Pending Amount"])
+    row = 1
+    for branch in range(n_branches):
+        for day in range(n_dates):
+            sheet.write_string(row, 0, f"Branch {branch}")
+            sheet.write_datetime(row, 1, start + timedelta(days=7 * day), date_format)
+            sheet.write_row(row, 2, rng.integers(1_000, 1_000_000, 3).tolist())
+            row += 1
+    workbook.close()
+    return buffer.getvalue()
+
+
+def make_trend_workbook(n_rows, n_dates):
+    """Wide trend workbook: a category column followed by one amount column per date."""
+    rng = np.random.default_rng(1)
+    start = datetime(2024, 1, 1)
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True})
+    sheet = workbook.add_worksheet()
+    headers = ["Ageing Category"] + [(start + timedelta(days=7 * i)).strftime("%d-%b-%y") for i in range(n_dates)]
+    sheet.write_row(0, 0, headers)
+    for row in range(1, n_rows + 1):
+        sheet.write_string(row, 0, f"Category {row}")
+        sheet.write_row(row, 1, (rng.random(n_dates) * 100_000).round(2).tolist())
+    workbook.close()
+    return buffer.getvalue()
+
+
+def _measure_reader(args):
+    content, reader = args
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    df = app.read_workbook(content, reader, header=0)
+    elapsed = time.perf_counter() - started
+    return elapsed, peak_rss_mb() - baseline, df.shape
+
+
+def bench_excel_readers(repeat=3):
+    """Parse time and peak memory of each Excel reader backend on realistic workbook sizes."""
+    workbooks = {
+        "collections 500 branches x 52 dates": make_collections_workbook(500, 52),
+        "collections 2000 branches x 52 dates": make_collections_workbook(2000, 52),
+        "trend 5000 rows x 40 dates": make_trend_workbook(5000, 40),
+    }
+    readers = ["openpyxl", "openpyxl_stream"]
+    if app.CalamineWorkbook is not None:
+        readers.append("calamine")
+    else:
+        print("python-calamine is not installed; skipping the calamine reader")
+
+    # Each measurement runs in a fresh process so peak memory is not shared between readers
+    context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+    print(f"{'workbook':40} {'reader':16} {'rows x cols':>14} {'best s':>8} {'peak MB':>8}")
+    for name, content in workbooks.items():
+        for reader in readers:
+            results = []
+            for _ in range(repeat):
+                with context.Pool(1) as pool:
+                    results.append(pool.apply(_measure_reader, ((content, reader),)))
+            best = min(result[0] for result in results)
+            peak = max(result[1] for result in results)
+            shape = results[0][2]
+            print(f"{name:40} {reader:16} {f'{shape[0]} x {shape[1]}':>14} {best:8.3f} {peak:8.1f}")
+
+
+def make_trend_frame(n_rows, n_dates):
+    """TSG-style wide frame: a category column followed by one amount column per date."""
+    rng = np.random.default_rng(2)
+    start = datetime(2024, 1, 1)
+    data = {"Ageing Category": [f"Category {i}" for i in range(n_rows)]}
+    for i in range(n_dates):
+        data[(start + timedelta(days=7 * i)).strftime("%Y-%m-%d")] = rng.integers(0, 5, n_rows).astype(float) * 1000
+    return pd.DataFrame(data)
+
+
+def legacy_style_tsg_trend(df):
+    """The previous row-wise TSG styler, kept as the baseline for bench_trend_styles."""
+    def color_changes(row):
+        styles = [''] * len(df.columns)
+        date_cols = [col for col in df.columns if col != 'Ageing Category']
+        date_cols.sort(reverse=True)
+        for i in range(len(date_cols) - 1):
+            current_val = row[date_cols[i]]
+            next_val = row[date_cols[i + 1]]
+            col_idx = df.columns.get_loc(date_cols[i])
+            if pd.notna(current_val) and pd.notna(next_val):
+                if current_val < next_val:
+                    styles[col_idx] = 'background-color: #92D050'
+                elif current_val > next_val:
+                    styles[col_idx] = 'background-color: #FF7575'
+        return styles
+
+    return df.style.apply(color_changes, axis=1)
+
+
+def bench_trend_styles(repeat=3):
+    """Style computation and HTML render time of trend tables, row-wise baseline vs vectorized."""
+    print(f"{'table':20} {'styler':12} {'styles s':>9} {'render s':>9}")
+    for n_rows, n_dates in [(1000, 24), (5000, 24), (5000, 48)]:
+        df = make_trend_frame(n_rows, n_dates)
+        for name, styler in [("row-wise", legacy_style_tsg_trend), ("vectorized", app.style_tsg_trend)]:
+            style_times, render_times = [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                styled = styler(df)
+                styled._compute()
+                style_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                styler(df).to_html()
+                render_times.append(time.perf_counter() - started)
+            print(f"{f'{n_rows} x {n_dates}':20} {name:12} {min(style_times):9.3f} {min(render_times):9.3f}")
+
+
+def bench_paginated_tables(repeat=3, full_render_limit=10_000):
+    """Render time of a styled trend table shown whole vs one page at a time, as rows grow."""
+    page_size = 50
+    print(f"{'rows':>8} {'full table s':>13} {'one page s':>11}")
+    for n_rows in [500, 2_000, 10_000, 50_000]:
+        df = make_trend_frame(n_rows, 24)
+        full = "skipped"
+        if n_rows <= full_render_limit:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                app.style_tsg_trend(df).to_html()
+                timings.append(time.perf_counter() - started)
+            full = f"{min(timings):.3f}"
+
+        timings = []
+        for page in range(repeat):
+            # What show_paginated_table does for the visible page
+            started = time.perf_counter()
+            start = page * page_size
+            app.style_tsg_trend(df.iloc[start:start + page_size]).to_html()
+            timings.append(time.perf_counter() - started)
+        print(f"{n_rows:8} {full:>13} {min(timings):11.3f}")
+
+
+def make_task_frame(n_tasks, vocabulary_size=5_000):
+    """Task Status frame with generated descriptions and comments."""
+    rng = np.random.default_rng(3)
+    syllables = ["led", "ger", "rec", "on", "cile", "ven", "dor", "pay", "ment", "au", "dit", "bran", "ch", "del", "hi", "clo", "se", "in", "voice", "tax"]
+    vocabulary = np.array(["".join(rng.choice(syllables, rng.integers(2, 4))) + str(i % 97) for i in range(vocabulary_size)])
+    descriptions = [" ".join(words) for words in rng.choice(vocabulary, (n_tasks, 8))]
+    comments = [" ".join(words) if i % 3 else None for i, words in enumerate(rng.choice(vocabulary, (n_tasks, 5)))]
+    return pd.DataFrame({"Task Description": descriptions, "Comments": comments}), vocabulary
+
+
+def bench_task_search(repeat=20):
+    """Index build time and query latency of the task search index vs a linear str.contains scan."""
+    print(f"{'tasks':>8} {'build s':>8} {'query':28} {'index ms':>9} {'scan ms':>8} {'hits':>6}")
+    for n_tasks in [1_000, 10_000, 100_000]:
+        df, vocabulary = make_task_frame(n_tasks)
+        started = time.perf_counter()
+        index = app.TaskSearchIndex(df)
+        build = time.perf_counter() - started
+
+        word = vocabulary[7]
+        queries = {
+            "exact word": word,
+            "prefix": word[:4],
+            "two words": " ".join(df["Task Description"].iloc[0].split()[:2]),
+            "misspelled": word[:-3] + word[-2:] if len(word) > 4 else word,
+        }
+        for name, query in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                hits = index.search(query)
+                timings.append(time.perf_counter() - started)
+
+            # Previous behaviour: a case-insensitive scan of the description only
+            started = time.perf_counter()
+            df["Task Description"].str.contains(query, case=False, na=False)
+            scan = time.perf_counter() - started
+            print(f"{n_tasks:8} {build:8.2f} {name + ' ' + repr(query):28.28} {min(timings) * 1000:9.3f} {scan * 1000:8.1f} {len(hits):6}")
+
+
+def make_reminder_tasks(n_tasks):
+    """Pending tasks of one assignee, two thirds of them with a due date."""
+    rng = np.random.default_rng(4)
+    due = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90, n_tasks), unit="D")
+    return pd.DataFrame({
+        "Task Description": [f"Reconcile ledger {i} for <branch> & vendor" for i in range(n_tasks)],
+        "Due Date": due.where(np.arange(n_tasks) % 3 != 0),
+        "Comments": [f"note {i}" if i % 2 else None for i in range(n_tasks)],
+    })
+
+
+def legacy_reminder_html(tasks, recipient_name):
+    """The previous += reminder body builder, kept as the baseline for bench_reminder_emails."""
+    tasks_with_due_date = tasks[tasks["Due Date"].notna()].sort_values(by="Due Date")
+    tasks_without_due_date = tasks[tasks["Due Date"].isna()]
+    email_content = f"<html><body><p>Hello {recipient_name},</p>"
+    if not tasks_with_due_date.empty:
+        email_content += "<table><tbody>"
+        for index, row in tasks_with_due_date.iterrows():
+            task = row.get("Task Description", "N/A")
+            due_date = row["Due Date"].strftime("%Y-%m-%d") if pd.notnull(row["Due Date"]) else "N/A"
+            comments = row.get("Comments", "No comments available")
+            email_content += f"""
+                <tr>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{index + 1}</td>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{task}</td>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{due_date}</td>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{comments}</td>
+                </tr>
+            """
+        email_content += "</tbody></table>"
+    if not tasks_without_due_date.empty:
+        email_content += "<ul>"
+        for index, row in tasks_without_due_date.iterrows():
+            task = row.get("Task Description", "N/A")
+            comments = row.get("Comments", "No comments available")
+            email_content += f"<li>{task} – {comments}</li>"
+        email_content += "</ul>"
+    return email_content + "</body></html>"
+
+
+def bench_reminder_emails(repeat=3):
+    """Render time of one assignee's reminder email, += row builder vs compiled template from column arrays."""
+    print(f"{'tasks':>8} {'builder s':>10} {'template s':>11} {'speedup':>8}")
+    for n_tasks in [1_000, 5_000, 20_000]:
+        tasks = make_reminder_tasks(n_tasks)
+        timings = {}
+        for name, render in [("builder", legacy_reminder_html), ("template", app.render_reminder_email)]:
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render(tasks, "Sujoy")
+                runs.append(time.perf_counter() - started)
+            timings[name] = min(runs)
+        print(f"{n_tasks:8} {timings['builder']:10.3f} {timings['template']:11.3f} {timings['builder'] / timings['template']:7.1f}x")
+
+
+BENCHMARKS = {
+    "excel_readers": bench_excel_readers,
+    "trend_styles": bench_trend_styles,
+    "paginated_tables": bench_paginated_tables,
+    "task_search": bench_task_search,
+    "reminder_emails": bench_reminder_emails,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for benchmark in selected:
+        print(f"\n== {benchmark}: {BENCHMARKS[benchmark].__doc__}")
+        BENCHMARKS[benchmark]()
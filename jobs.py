@@ -0,0 +1,294 @@
+"""
+Job runner for the dashboard's scheduled and queued work, outside the Streamlit request path.
+
+Sends the daily task digest and overdue escalation on a schedule, and runs jobs the
+dashboard adds to the file queue under .cache/jobs. Every run is recorded with its
+timing and outcome in .cache/jobs/history.jsonl, which the dashboard shows to admins.
+Run it from the project root with the app's secrets in place:
+
+    python jobs.py                          # run the scheduler and queue worker
+    python jobs.py run daily_digest         # run one job now
+    python jobs.py enqueue overdue_escalation
+    python jobs.py history                  # show recent runs
+"""
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+
+import pytz
+
+import app
+
+# Local time of day at which each scheduled job is queued, once per day
+JOB_SCHEDULE = {
+    "daily_digest": "09:00",
+    "overdue_escalation": "10:00"
+}
+
+JOB_TIMEZONE = pytz.timezone('Asia/Kolkata')
+
+JOB_RUNNING_DIR = os.path.join(app.JOB_DIR, "running")
+# Jobs that failed, could not be read or were interrupted are kept here for inspection
+JOB_FAILED_DIR = os.path.join(app.JOB_DIR, "failed")
+JOB_SCHEDULE_STATE_PATH = os.path.join(app.JOB_DIR, "schedule.json")
+
+
+def load_tasks():
+    """Current task status data, loaded the same way as the dashboard."""
+    df = app.load_task_status_data()
+    if df is None:
+        raise RuntimeError("Task status data could not be loaded")
+    return df
+
+
+def recipient_emails(names=None):
+    """Reminder recipients from the [emails] secrets, optionally limited to the given names."""
+    recipients = dict(app.st.secrets.get("emails", {}))
+    if names is None:
+        return recipients
+    missing = [name for name in names if name not in recipients]
+    if missing:
+        raise ValueError(f"No email configured for {', '.join(missing)}")
+    return {name: recipients[name] for name in names}
+
+
+def send_emails(emails):
+    """Send emails with the bulk mailer and summarise the results; raises if any email failed."""
+    results = app.BulkMailer(app.get_mail_transport(), **app.MAILER_CONFIG).send_all(emails)
+    failed = [f"{r['name']}: {r['error']}" for r in results if not r["sent"]]
+    summary = f"{len(results) - len(failed)} of {len(results)} emails sent"
+    if failed:
+        raise RuntimeError(f"{summary}; failed: {'; '.join(failed)}")
+    return summary
+
+
+def run_task_reminders(params):
+    """Pending task reminders for the recipients named in params, or everyone."""
+    return send_emails(app.build_reminder_emails(load_tasks(), recipient_emails(params.get("recipients"))))
+
+
+def run_daily_digest(params):
+    """Pending task reminders for every recipient."""
+    return run_task_reminders({})
+
+
+def run_overdue_escalation(params):
+    """One summary of all overdue tasks to the escalation address in the [jobs] secrets."""
+    recipient = params.get("email") or app.st.secrets.get("jobs", {}).get("escalation_email")
+    if not recipient:
+        raise ValueError("No escalation_email configured in the [jobs] secrets")
+    email = app.build_escalation_email(load_tasks(), recipient)
+    if email is None:
+        return "No overdue tasks"
+    return send_emails([email])
+
+
+JOBS = {
+    "task_reminders": run_task_reminders,
+    "daily_digest": run_daily_digest,
+    "overdue_escalation": run_overdue_escalation
+}
+
+
+def record_job(record):
+    try:
+        os.makedirs(app.JOB_DIR, exist_ok=True)
+        line = (json.dumps(record, default=str) + "\n").encode()
+        with open(app.JOB_HISTORY_PATH, "ab+") as history_file:
+            # Start on a new line if a crash left the previous record unfinished
+            history_file.seek(0, os.SEEK_END)
+            if history_file.tell():
+                history_file.seek(-1, os.SEEK_END)
+                if history_file.read(1) != b"\n":
+                    line = b"\n" + line
+            history_file.write(line)
+    except OSError:
+        # A history write failure is logged, not allowed to stop the runner
+        traceback.print_exc()
+
+
+def mark_failed(path):
+    """Move a job file out of the queue into the failed directory."""
+    try:
+        os.makedirs(JOB_FAILED_DIR, exist_ok=True)
+        os.replace(path, os.path.join(JOB_FAILED_DIR, os.path.basename(path)))
+    except OSError:
+        traceback.print_exc()
+
+
+def read_job_file(path):
+    """Load a queued job, recording it as failed if the file is not a valid job."""
+    try:
+        with open(path) as job_file:
+            job = json.load(job_file)
+        if not isinstance(job, dict) or "kind" not in job:
+            raise ValueError("not a job object")
+        job.setdefault("id", os.path.splitext(os.path.basename(path))[0])
+        return job
+    except (OSError, ValueError) as e:
+        print(f"Unreadable job file {os.path.basename(path)}: {e}")
+        record_job({
+            "id": os.path.splitext(os.path.basename(path))[0],
+            "kind": "unknown",
+            "started_at": time.time(),
+            "duration_seconds": 0,
+            "outcome": "failed",
+            "error": f"Unreadable job file: {e}"
+        })
+        mark_failed(path)
+        return None
+
+
+def run_job(job):
+    """Run one job and append its timing and outcome to the history."""
+    record = {
+        "id": job["id"],
+        "kind": job["kind"],
+        "params": job.get("params", {}),
+        "source": job.get("source"),
+        "enqueued_at": job.get("enqueued_at"),
+        "started_at": time.time()
+    }
+    started = time.perf_counter()
+    try:
+        handler = JOBS.get(job["kind"])
+        if handler is None:
+            raise ValueError(f"Unknown job kind '{job['kind']}'")
+        record["summary"] = handler(job.get("params", {}))
+        record["outcome"] = "succeeded"
+    except Exception as e:
+        record["outcome"] = "failed"
+        record["error"] = str(e)
+        traceback.print_exc()
+    record["duration_seconds"] = time.perf_counter() - started
+    record_job(record)
+    print(f"{job['kind']} {record['outcome']} in {record['duration_seconds']:.1f}s: {record.get('summary') or record.get('error')}")
+    return record
+
+
+def process_queue():
+    """Run every queued job in the order it was added."""
+    os.makedirs(app.JOB_QUEUE_DIR, exist_ok=True)
+    os.makedirs(JOB_RUNNING_DIR, exist_ok=True)
+    for filename in sorted(f for f in os.listdir(app.JOB_QUEUE_DIR) if f.endswith(".json")):
+        # Moving the file claims the job, so a second runner cannot pick it up as well
+        running_path = os.path.join(JOB_RUNNING_DIR, filename)
+        try:
+            os.replace(os.path.join(app.JOB_QUEUE_DIR, filename), running_path)
+        except FileNotFoundError:
+            continue
+        job = read_job_file(running_path)
+        if job is None:
+            continue
+        record = run_job(job)
+        if record["outcome"] == "succeeded":
+            os.remove(running_path)
+        else:
+            mark_failed(running_path)
+
+
+def recover_interrupted_jobs():
+    """Record jobs left running by a stopped runner as failed instead of repeating their sends."""
+    if not os.path.isdir(JOB_RUNNING_DIR):
+        return
+    for filename in os.listdir(JOB_RUNNING_DIR):
+        path = os.path.join(JOB_RUNNING_DIR, filename)
+        job = read_job_file(path)
+        if job is None:
+            continue
+        record_job({
+            "id": job["id"],
+            "kind": job["kind"],
+            "params": job.get("params", {}),
+            "source": job.get("source"),
+            "enqueued_at": job.get("enqueued_at"),
+            "started_at": os.path.getmtime(path),
+            "duration_seconds": 0,
+            "outcome": "failed",
+            "error": "Interrupted: the job runner stopped while this job was running"
+        })
+        mark_failed(path)
+
+
+def enqueue_scheduled_jobs(now=None):
+    """Queue each scheduled job once its time has passed today, if it has not been queued today."""
+    now = now or datetime.now(JOB_TIMEZONE)
+    try:
+        with open(JOB_SCHEDULE_STATE_PATH) as state_file:
+            last_queued = json.load(state_file)
+    except (OSError, ValueError):
+        last_queued = {}
+
+    today = now.strftime("%Y-%m-%d")
+    for kind, at in JOB_SCHEDULE.items():
+        if now.strftime("%H:%M") >= at and last_queued.get(kind) != today:
+            app.enqueue_job(kind, source="schedule")
+            last_queued[kind] = today
+
+    os.makedirs(app.JOB_DIR, exist_ok=True)
+    with open(JOB_SCHEDULE_STATE_PATH + ".tmp", "w") as state_file:
+        json.dump(last_queued, state_file)
+    os.replace(JOB_SCHEDULE_STATE_PATH + ".tmp", JOB_SCHEDULE_STATE_PATH)
+
+
+def write_heartbeat():
+    try:
+        with open(app.JOB_HEARTBEAT_PATH, "w") as heartbeat:
+            heartbeat.write(str(time.time()))
+    except OSError:
+        traceback.print_exc()
+
+
+def start_heartbeat():
+    """Touch the heartbeat the dashboard checks on its own thread, so it stays fresh during long jobs."""
+    def beat():
+        while True:
+            write_heartbeat()
+            time.sleep(app.JOB_RUNNER_CONFIG["poll_seconds"])
+
+    thread = threading.Thread(target=beat, name="job-heartbeat", daemon=True)
+    thread.start()
+    return thread
+
+
+def run_forever():
+    """Poll the schedule and the queue until stopped; errors are logged and polling continues."""
+    os.makedirs(app.JOB_DIR, exist_ok=True)
+    start_heartbeat()
+    try:
+        recover_interrupted_jobs()
+    except Exception:
+        traceback.print_exc()
+    print(f"Job runner started; schedule: {', '.join(f'{kind} at {at}' for kind, at in JOB_SCHEDULE.items())}")
+    while True:
+        try:
+            enqueue_scheduled_jobs()
+            process_queue()
+        except Exception:
+            traceback.print_exc()
+        time.sleep(app.JOB_RUNNER_CONFIG["poll_seconds"])
+
+
+def show_history(limit=20):
+    for job in app.read_job_history(limit):
+        started = datetime.fromtimestamp(job["started_at"], JOB_TIMEZONE).strftime("%Y-%m-%d %H:%M")
+        print(f"{started} {job['kind']:20} {job.get('source') or '':10} {job['duration_seconds']:7.1f}s {job['outcome']:10} {job.get('summary') or job.get('error')}")
+
+
+if __name__ == "__main__":
+    command, *args = sys.argv[1:] or ["serve"]
+    if command == "serve":
+        run_forever()
+    elif command == "run" and len(args) == 1 and args[0] in JOBS:
+        record = run_job({"id": f"manual-{int(time.time() * 1000)}", "kind": args[0], "params": {}, "source": "manual"})
+        sys.exit(record["outcome"] != "succeeded")
+    elif command == "enqueue" and len(args) == 1 and args[0] in JOBS:
+        print(app.enqueue_job(args[0], source="manual"))
+    elif command == "history":
+        show_history()
+    else:
+        sys.exit(f"Usage: python jobs.py [serve | run JOB | enqueue JOB | history]; jobs: {', '.join(JOBS)}")
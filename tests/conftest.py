@@ -0,0 +1,43 @@
+"""
+Test setup: make app.py importable.
+
+app.py reads Streamlit secrets at import time. When no secrets.toml is configured,
+placeholder secrets are used so the pure functions can be tested without Drive or
+SendGrid credentials.
+"""
+import os
+import sys
+
+from streamlit.runtime.secrets import SECRETS_FILE_LOCS, secrets_singleton
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PLACEHOLDER_SECRETS = """
+[users]
+admin = "admin"
+ceo = "ceo"
+manager = "manager"
+
+[google_drive]
+collections_data = "collections"
+itss_tender = "itss"
+sdr_trend = "sdr"
+tsg_trend = "tsg"
+task_status = "tasks"
+
+[sendgrid]
+api_key = "test"
+from_email = "tasks@example.com"
+transport = "stub"
+
+[emails]
+sujoy = "sujoy@example.com"
+"""
+
+if not any(os.path.exists(path) for path in SECRETS_FILE_LOCS):
+    path = os.path.join(ROOT, ".cache", "test_secrets.toml")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as secrets_file:
+        secrets_file.write(PLACEHOLDER_SECRETS)
+    secrets_singleton._file_paths = [path]
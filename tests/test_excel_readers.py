@@ -0,0 +1,80 @@
+import io
+from datetime import date, datetime, time
+
+import openpyxl
+import pandas as pd
+import pytest
+import xlsxwriter
+
+import app
+
+READERS = ["calamine", "openpyxl_stream"]
+
+# Dates, times, booleans, error values, whole and fractional numbers, a duplicate
+# header, an unnamed column, blank cells and a blank row in the middle, and blank
+# trailing rows that both readers must drop
+ROWS = [
+    ["Name", "Amount", "Date", "Name", "Flag", "Note", None, "Time"],
+    ["a", 1, datetime(2024, 1, 5), "x", True, " t ", None, time(10, 30)],
+    ["b", 2.5, date(2024, 2, 1), "y", False, "", None, None],
+    [None, None, None, None, None, None, None, None],
+    ["c", "#N/A", datetime(2024, 3, 1, 12, 30), "z", None, "note", None, None],
+    ["d", "#DIV/0!", "2024-01-01", 3, 1.0, None, None, None],
+    [2 ** 40, -3.25, None, None, None, None, None, None],
+    [None, None, None, None, None, None, None, None],
+]
+
+
+def openpyxl_workbook(rows):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def xlsxwriter_workbook(rows):
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer)
+    sheet = workbook.add_worksheet()
+    for row_number, row in enumerate(rows):
+        sheet.write_row(row_number, 0, row)
+    workbook.close()
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("reader", READERS)
+@pytest.mark.parametrize("header", [0, None])
+def test_readers_match_read_excel(reader, header):
+    content = openpyxl_workbook(ROWS)
+    expected = pd.read_excel(io.BytesIO(content), header=header, engine="openpyxl")
+    pd.testing.assert_frame_equal(app.read_workbook(content, reader, header=header), expected)
+
+
+@pytest.mark.parametrize("reader", READERS)
+@pytest.mark.parametrize("rows", [[], [["a", "b"]], [[None, None], ["a", "b"], [1, 2]], [[None, "a"], [None, 1]]])
+def test_readers_match_read_excel_on_sparse_sheets(reader, rows):
+    content = openpyxl_workbook(rows)
+    for header in (0, None):
+        expected = pd.read_excel(io.BytesIO(content), header=header, engine="openpyxl")
+        pd.testing.assert_frame_equal(app.read_workbook(content, reader, header=header), expected)
+
+
+@pytest.mark.parametrize("reader", READERS)
+def test_whitespace_only_text_is_kept_when_the_workbook_preserves_it(reader):
+    # Excel and xlsxwriter mark whitespace-only strings with xml:space="preserve"
+    content = xlsxwriter_workbook([["Name", "Note"], ["a", "  "]])
+    expected = pd.read_excel(io.BytesIO(content), engine="openpyxl")
+    pd.testing.assert_frame_equal(app.read_workbook(content, reader), expected)
+    assert expected["Note"].tolist() == ["  "]
+
+
+def test_calamine_drops_unpreserved_whitespace_only_text():
+    # Known difference: openpyxl writes whitespace-only strings without
+    # xml:space="preserve", and calamine then reads an empty (missing) cell where
+    # pd.read_excel keeps the spaces
+    content = openpyxl_workbook([["Name", "Note"], ["a", "  "]])
+    assert pd.read_excel(io.BytesIO(content), engine="openpyxl")["Note"].tolist() == ["  "]
+    assert app.read_workbook(content, "calamine")["Note"].isna().all()
+    assert app.read_workbook(content, "openpyxl_stream")["Note"].tolist() == ["  "]
@@ -0,0 +1,46 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+def test_excel_export_round_trips_every_sheet():
+    sheets = {
+        "Raw Data": pd.DataFrame({
+            "Branch Name": pd.Categorical(["Kota", "Guwahati", "Kota"]),
+            "Date": pd.to_datetime(["2024-01-01", None, "2024-01-15"]),
+            "Amount": np.array([1, 2, 3], dtype=np.int32),
+            "Pending": [1.5, np.nan, -2.25],
+        }),
+        "A sheet name longer than thirty-one characters": pd.DataFrame({1: ["a", None]}),
+    }
+    back = pd.read_excel(io.BytesIO(app.write_excel_export(sheets)), sheet_name=None)
+
+    assert list(back) == ["Raw Data", "A sheet name longer than thirty"]
+    raw = back["Raw Data"]
+    assert raw["Branch Name"].tolist() == ["Kota", "Guwahati", "Kota"]
+    assert raw["Amount"].tolist() == [1, 2, 3]
+    # Missing values are written as empty cells
+    assert raw["Date"].isna().tolist() == [False, True, False]
+    assert raw["Date"].iloc[2] == pd.Timestamp("2024-01-15")
+    assert raw["Pending"].iloc[[0, 2]].tolist() == [1.5, -2.25] and np.isnan(raw["Pending"].iloc[1])
+    # Headers are written as text
+    assert back["A sheet name longer than thirty"].columns.tolist() == ["1"]
+
+
+def test_export_rows_are_the_same_across_chunk_boundaries():
+    df = pd.DataFrame({"a": range(7), "b": [1.0, None, 3.0, None, 5.0, 6.0, None]})
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        rows = list(app.iter_export_rows(df, executor, chunk_rows=3))
+        assert list(app.iter_export_rows(df.iloc[:0], executor, chunk_rows=3)) == []
+    assert rows == [(0, 1.0), (1, None), (2, 3.0), (3, None), (4, 5.0), (5, 6.0), (6, None)]
+
+
+def test_sheets_over_the_excel_row_limit_are_refused(monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_MAX_ROWS", 5)
+    with pytest.raises(ValueError, match="Export as CSV or Parquet"):
+        app.write_excel_export({"Big": pd.DataFrame({"a": range(5)})})
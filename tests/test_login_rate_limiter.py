@@ -0,0 +1,63 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "time", lambda: now[0])
+    return now
+
+
+def make_limiter(**overrides):
+    config = {"max_attempts": 3, "max_client_attempts": 5, "window_seconds": 300, "max_tracked_keys": 100}
+    config.update(overrides)
+    return app.LoginRateLimiter(**config)
+
+
+def test_username_is_locked_only_for_the_failing_client(clock):
+    limiter = make_limiter()
+    for _ in range(3):
+        assert limiter.retry_after("1.1.1.1", "admin") == 0
+        limiter.record_failure("1.1.1.1", "admin")
+    assert limiter.retry_after("1.1.1.1", "admin") == 300
+    assert limiter.retry_after("2.2.2.2", "admin") == 0
+    assert limiter.retry_after("1.1.1.1", "ceo") == 0
+
+
+def test_lock_ends_when_the_oldest_counted_failure_leaves_the_window(clock):
+    limiter = make_limiter()
+    for _ in range(3):
+        limiter.record_failure("1.1.1.1", "admin")
+        clock[0] += 10
+    assert limiter.retry_after("1.1.1.1", "admin") == 300 - 30
+    clock[0] += 270
+    assert limiter.retry_after("1.1.1.1", "admin") == 0
+
+
+def test_client_is_limited_across_usernames_including_unknown_ones(clock):
+    limiter = make_limiter()
+    for i in range(5):
+        limiter.record_failure("1.1.1.1", f"guess{i}", known_user=False)
+    assert limiter.retry_after("1.1.1.1", "admin") == 300
+    assert limiter.retry_after("2.2.2.2", "admin") == 0
+    # Unknown usernames are not tracked on their own
+    assert ("1.1.1.1", "guess0") not in limiter._failures
+
+
+def test_reset_clears_the_client_and_username_counts(clock):
+    limiter = make_limiter()
+    for _ in range(3):
+        limiter.record_failure("1.1.1.1", "admin")
+    limiter.reset("1.1.1.1", "admin")
+    assert limiter.retry_after("1.1.1.1", "admin") == 0
+
+
+def test_oldest_keys_are_dropped_beyond_the_cap(clock):
+    limiter = make_limiter(max_tracked_keys=4)
+    for i in range(5):
+        limiter.record_failure(f"10.0.0.{i}", "admin")
+    assert len(limiter._failures) == 4
+    assert ("10.0.0.0", "admin") not in limiter._failures
+    assert ("10.0.0.4", "admin") in limiter._failures
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pandas as pd
+
+import app
+
+
+class TimedStubTransport(app.StubTransport):
+    """Stub transport that also records when each send happened and how many ran at once."""
+
+    def __init__(self, failures=0, delay=0):
+        super().__init__(failures)
+        self.delay = delay
+        self.times = []
+        self.active = 0
+        self.max_active = 0
+
+    def send(self, email):
+        with self._lock:
+            self.times.append(time.monotonic())
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            super().send(email)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_emails(n):
+    return [{"name": f"user{i}", "email": f"user{i}@example.com", "subject": "s", "html": "h", "task_count": 1} for i in range(n)]
+
+
+def make_mailer(transport, **overrides):
+    config = {"max_workers": 4, "max_retries": 3, "retry_backoff_seconds": 0, "max_per_second": 1000}
+    config.update(overrides)
+    return app.BulkMailer(transport, **config)
+
+
+def test_failed_sends_are_retried_until_they_succeed():
+    transport = app.StubTransport(failures=2)
+    results = make_mailer(transport, max_workers=1).send_all(make_emails(1))
+    assert results[0]["sent"]
+    assert results[0]["attempts"] == 3
+    assert len(transport.sent) == 1
+
+
+def test_send_gives_up_after_max_retries():
+    transport = app.StubTransport(failures=100)
+    results = make_mailer(transport, max_retries=2).send_all(make_emails(3))
+    assert [r["sent"] for r in results] == [False, False, False]
+    assert all(r["attempts"] == 2 and r["error"] == "Stub transport failure" for r in results)
+    assert transport.sent == []
+
+
+def test_results_keep_the_order_of_the_emails():
+    emails = make_emails(12)
+    results = make_mailer(app.StubTransport()).send_all(emails)
+    assert [r["email"] for r in results] == [e["email"] for e in emails]
+    assert all(r["sent"] and r["attempts"] == 1 for r in results)
+
+
+def test_sends_are_spaced_to_the_rate_limit_across_workers():
+    transport = TimedStubTransport()
+    make_mailer(transport, max_workers=4, max_per_second=20).send_all(make_emails(8))
+    times = sorted(transport.times)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # 20 per second leaves at least 50 ms between any two sends, allowing for timer jitter
+    assert min(gaps) >= 0.045
+    assert times[-1] - times[0] >= 7 * 0.045
+
+
+def test_retries_also_wait_for_the_rate_limit():
+    transport = TimedStubTransport(failures=3)
+    results = make_mailer(transport, max_workers=1, max_retries=4, max_per_second=20).send_all(make_emails(1))
+    assert results[0]["attempts"] == 4
+    times = transport.times
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.045
+
+
+def test_worker_pool_is_bounded():
+    transport = TimedStubTransport(delay=0.05)
+    make_mailer(transport, max_workers=3).send_all(make_emails(12))
+    assert transport.max_active <= 3
+    assert len(transport.sent) == 12
+
+
+def test_reminders_are_grouped_by_normalized_assignee():
+    df = pd.DataFrame({
+        "Task Description": ["a", "b", "c", "d", "e"],
+        "Assigned To": ["Sujoy", "sujoy ", " SUJOY", "Mehboob", None],
+        "Due Date": pd.to_datetime(["2024-01-05", "2024-01-03", None, "2024-01-04", "2024-01-01"]),
+        "Status": ["Not Started", "In Progress", "Not Started", "Completed", "Not Started"],
+        "Completion Date": [None] * 5,
+        "Comments": [None] * 5,
+    })
+    emails = app.build_reminder_emails(df, {"Sujoy": "sujoy@example.com", "mehboob": "mehboob@example.com"})
+    assert [(e["name"], e["email"], e["task_count"]) for e in emails] == [("Sujoy", "sujoy@example.com", 3)]
+
+
+def test_reminder_text_is_escaped():
+    df = pd.DataFrame({
+        "Task Description": ["<script>alert(1)</script>"],
+        "Assigned To": ["Sujoy"],
+        "Due Date": pd.to_datetime(["2024-01-05"]),
+        "Status": ["Not Started"],
+        "Completion Date": [None],
+        "Comments": ["a & b"],
+    })
+    html = app.build_reminder_emails(df, {"sujoy": "sujoy@example.com"})[0]["html"]
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html and "a &amp; b" in html
+
+
+def test_reminders_through_the_stub_transport():
+    df = pd.DataFrame({
+        "Task Description": ["a", "b"],
+        "Assigned To": ["Sujoy", "sujoy"],
+        "Due Date": pd.to_datetime(["2024-01-05", None]),
+        "Status": ["Not Started", "In Progress"],
+        "Completion Date": [None, None],
+        "Comments": [None, "note"],
+    })
+    transport = app.StubTransport()
+    results = app.send_task_reminders(df, {"sujoy": "sujoy@example.com"}, transport=transport)
+    assert [r["sent"] for r in results] == [True]
+    assert [e["email"] for e in transport.sent] == ["sujoy@example.com"]
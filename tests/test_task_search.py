@@ -0,0 +1,41 @@
+import pandas as pd
+
+import app
+
+
+def make_index():
+    df = pd.DataFrame({
+        "Task Description": [
+            "Reconcile vendor ledger",
+            "Prepare bankers report",
+            "Vendor payment follow-up",
+            "Reconciliation of bank statements",
+            None,
+        ],
+        "Comments": [None, "ask the vendor", None, "urgent", "ledger pending"],
+    })
+    return app.TaskSearchIndex(df)
+
+
+def test_empty_query_returns_every_task_in_order():
+    assert make_index().search("  ").tolist() == [0, 1, 2, 3, 4]
+
+
+def test_description_matches_rank_above_comment_matches():
+    # Exact description matches first, in task order, then the comment match
+    assert make_index().search("vendor").tolist() == [0, 2, 1]
+
+
+def test_exact_words_rank_above_prefixes():
+    assert make_index().search("recon").tolist() == [0, 3]
+    assert make_index().search("bank").tolist() == [3, 1]
+
+
+def test_every_term_must_match():
+    assert make_index().search("vendor ledger").tolist() == [0]
+    assert make_index().search("vendor statements").tolist() == []
+
+
+def test_words_are_found_by_substring_and_close_spelling():
+    assert make_index().search("conciliation").tolist() == [3]
+    assert make_index().search("ledgr").tolist() == [0, 4]
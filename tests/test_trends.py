@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+import app
+
+DATES = pd.to_datetime(["2024-01-01", "2024-01-08", "2024-01-15", "2024-01-22", "2024-01-29"])
+
+
+def long_frame(values):
+    """Long-format rows from {branch: [value per date]}, leaving out missing values."""
+    rows = [
+        {"Branch Name": branch, "Date": date, "Pending Amount": value}
+        for branch, branch_values in values.items()
+        for date, value in zip(DATES, branch_values)
+        if value is not None
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_trend_statistics_count_runs_and_deltas():
+    df = long_frame({"A": [10, 12, 15, 11, 9], "B": [5, None, 7, 7, 8]})
+    stats = app.compute_trend_statistics(df, "Branch Name", "Date", "Pending Amount")
+
+    a = stats.loc["A"]
+    assert (a.increase_count, a.decrease_count) == (2, 2)
+    assert (a.longest_increase_streak, a.longest_decrease_streak) == (2, 2)
+    assert a.current_streak == -2
+    assert (a.latest_delta, a.total_delta) == (-2, -1)
+
+    # Pairs with a missing value count as no change
+    b = stats.loc["B"]
+    assert (b.increase_count, b.decrease_count, b.current_streak) == (1, 0, 1)
+    assert (b.latest_delta, b.total_delta) == (1, 3)
+
+
+def test_trend_statistics_keep_requested_entities_without_data():
+    df = long_frame({"A": [10, 12, 15, 11, 9]})
+    stats = app.compute_trend_statistics(df, "Branch Name", "Date", "Pending Amount", entities=["C", "A"])
+    assert stats.index.tolist() == ["C", "A"]
+    assert (stats.loc["C", "increase_count"], stats.loc["C", "current_streak"]) == (0, 0)
+    assert np.isnan(stats.loc["C", "latest_delta"])
+
+
+def test_comparison_frame_has_one_column_per_metric_and_date():
+    df = pd.DataFrame({
+        "Branch Name": ["Kota", "Kota", "Guwahati", "Kota"],
+        "Date": DATES[[0, 1, 1, 1]],
+        "Balance As On": [100.0, 110.0, 50.0, 999.0],
+        "Pending Amount": [10.0, 11.0, 5.0, 999.0],
+    })
+    comparison = app.build_comparison_frame(df, ["Guwahati", "Kota"], [DATES[1], DATES[0]])
+    assert comparison.columns.tolist() == [
+        "Branch Name",
+        "Balance (2024-01-08)", "Pending (2024-01-08)",
+        "Balance (2024-01-01)", "Pending (2024-01-01)",
+    ]
+    # The first row of a duplicated branch and date is used; missing pairs are filled with 0
+    assert comparison.values.tolist() == [
+        ["Guwahati", 50.0, 5.0, 0.0, 0.0],
+        ["Kota", 110.0, 11.0, 100.0, 10.0],
+    ]